@@ -0,0 +1,69 @@
+from .brush_size_driver import BrushSizeDriver
+
+
+class FineBrushSizeDriver(BrushSizeDriver):
+    """Will keep track of the brush size changes, with a drag range that
+    is longer by the fine factor, so exact sizes are easier to reach.
+    The fine modifier does not make it longer again.
+    """
+
+    modifier_fine_control = False
+
+    def get_drag_distance(self, settings):
+        return settings.max_size * settings.fine_factor
+
+
+class BrushOpacityDriver(BrushSizeDriver):
+    """Will keep track of the painting opacity changes, in percent."""
+
+    preview_icon = False
+
+    def read_value(self, view):
+        return view.paintingOpacity() * 100.0
+
+    def write_value(self, view, value):
+        view.setPaintingOpacity(value / 100.0)
+
+    def get_value_range(self, settings):
+        return (0, 100)
+
+
+class BrushFlowDriver(BrushSizeDriver):
+    """Will keep track of the painting flow changes, in percent."""
+
+    preview_icon = False
+
+    def read_value(self, view):
+        return view.paintingFlow() * 100.0
+
+    def write_value(self, view, value):
+        view.setPaintingFlow(value / 100.0)
+
+    def get_value_range(self, settings):
+        return (0, 100)
+
+
+class BrushRotationDriver(BrushSizeDriver):
+    """Will keep track of the brush rotation changes, in degrees."""
+
+    preview_icon = False
+
+    def read_value(self, view):
+        return view.brushRotation()
+
+    def write_value(self, view, value):
+        view.setBrushRotation(value)
+
+    def get_value_range(self, settings):
+        return (0, 360)
+
+
+# The driver of every binding besides the default brush size binding,
+# by the name of the binding. The shortcut of a binding is stored in
+# the "<name>_shortcut" setting.
+PARAMETER_DRIVERS = {
+    "fine": FineBrushSizeDriver,
+    "opacity": BrushOpacityDriver,
+    "flow": BrushFlowDriver,
+    "rotation": BrushRotationDriver,
+}
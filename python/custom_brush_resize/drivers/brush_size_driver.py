@@ -1,44 +1,92 @@
-from krita import Krita, DockWidget
+from krita import Krita
 
-from PyQt5 import QtGui, QtCore, QtWidgets
+from PyQt5 import QtGui, QtCore
 
-from ..utils import remap, clamp
-from ..ui.c_brush_resize_dock import DOCK_OBJECT_NAME
+from .brush_tool_tracker import BrushToolTracker
+from .drag_geometry import create_drag_geometry
+from .drag_mapper import LinearDragMapper
+from .response_curve import ResponseCurve
+from ..utils import remap
+from ..ui.c_brush_resize_dock import SETTINGS_STORE
 
-# For finding ui elements within krita
-KRITA_TOOL_BOX_NAME = "ToolBox"
-KRITA_BRUSH_TOOL_NAME = "KritaShape/KisToolBrush"
 
+class BrushSizeDriver(QtCore.QObject):
+    """Will keep track of the brush size changes.
+    Other brush parameters can be dragged by overriding read_value,
+    write_value, get_value_range and get_drag_distance,
+    see brush_parameter_drivers.
+    """
 
-def get_brush_settings(q_window):
-    """Get all settings from the custom brush resize dock widget."""
-    settings_dock = q_window.findChild(DockWidget, DOCK_OBJECT_NAME)
-    if not settings_dock:
-        return {}
-    return settings_dock.as_dict()
-
+    # whether the brush icon shows the dragged value
+    preview_icon = True
 
-class BrushSizeDriver(QtCore.QObject):
-    """Will keep track of the brush size changes."""
+    # whether holding the fine modifier makes the drag range longer
+    modifier_fine_control = True
 
     start_resizing = QtCore.pyqtSignal()
     end_resizing = QtCore.pyqtSignal()
     brush_size_changed = QtCore.pyqtSignal(int)
 
-    def __init__(self) -> None:
+    def __init__(self, brush_tool_tracker=None) -> None:
+        """
+        :param brush_tool_tracker: the tracker of the brush tool button,
+            which is shared by every driver, a new one when not given
+        :type brush_tool_tracker: BrushToolTracker
+        """
         super(BrushSizeDriver, self).__init__()
         self.brush_size = None
         self.brush_size_before_change = None
         self.brush_size_after_change = None
         self.initial_press_position = None
+        self.press_timestamp = None
+        self.move_timestamp = None
         self.max_brush_size = None
         self.min_brush_size = None
         self.new_resize_max = None
+        self.drag_settings = None
+        self.drag_geometry = None
+        self.drag_mapper = None
+
+        # while fine control is enabled, the drag range is longer
+        # by the fine factor
+        self.fine_control = False
         self.view_while_resizing = None
         self.can_resize_brush = False
 
-    def start_resize(self, *_):
-        """Initialize the values needed for brush resizing."""
+        # the integer size that was last given to the view, and the
+        # amount it has to change by before the view is updated again
+        self.applied_brush_size = None
+        self.min_size_change = 1
+        self.applied_updates = 0
+        self.suppressed_updates = 0
+
+        # while previewing, the view is only updated by the
+        # catch up timer and once when the drag ends
+        self.preview_only = False
+        self.catch_up_timer = QtCore.QTimer(self)
+        self.catch_up_timer.timeout.connect(self.apply_brush_size)
+        # the dragged size that the catch up timer last looked at
+        self.caught_up_size = None
+
+        if brush_tool_tracker is None:
+            brush_tool_tracker = BrushToolTracker(parent=self)
+        self.brush_tool_tracker = brush_tool_tracker
+
+        # the lookup table of the response curve is only rebuilt
+        # when the settings that it depends on change
+        self.response_curve = None
+        self.update_response_curve(SETTINGS_STORE.snapshot)
+        SETTINGS_STORE.snapshot_changed.connect(self.update_response_curve)
+
+    def start_resize(self, position=None, timestamp=None, *_):
+        """Initialize the values needed for brush resizing.
+
+        :param position: the global position that was pressed,
+            defaults to the cursor position
+        :type position: QtCore.QPoint
+        :param timestamp: the time of the press in milliseconds
+        :type timestamp: int
+        """
         window = Krita.instance().activeWindow()
         # only resize brush if the window exists, the brush tool
         # is checked and a document exists!
@@ -53,43 +101,157 @@ class BrushSizeDriver(QtCore.QObject):
             return
 
         view = window.activeView()
-        q_window = window.qwindow()
 
         # store the starting press position for calculating the
         # distance that was dragged
-        self.initial_press_position = QtGui.QCursor.pos()
+        if position is None:
+            position = QtGui.QCursor.pos()
+        self.initial_press_position = QtCore.QPoint(position)
+        self.press_timestamp = timestamp
+        self.move_timestamp = timestamp
 
         # store current brush size
-        self.brush_size = view.brushSize()
-        self.brush_size_before_change = view.brushSize()
-        self.brush_size_after_change = view.brushSize()
+        self.brush_size = self.read_value(view)
+        self.brush_size_before_change = self.brush_size
+        self.brush_size_after_change = self.brush_size
+        self.applied_brush_size = int(self.brush_size)
+        self.caught_up_size = self.brush_size
 
         # store the current view so it does not have to be resolved again
         self.view_while_resizing = view
 
-        # read settings from custom brush resize dock widget
-        tool_settings = get_brush_settings(q_window)
-        self.max_brush_size = tool_settings.get("max_brush_size")
-        self.min_brush_size = tool_settings.get("min_brush_size")
-        self.new_resize_max = tool_settings.get("max_size")
+        # read the settings that the custom brush resize dock pushed
+        tool_settings = SETTINGS_STORE.snapshot
+        self.min_brush_size, self.max_brush_size = self.get_value_range(
+            tool_settings
+        )
+        self.drag_settings = tool_settings
+        # the fine modifier only counts once it is pressed while dragging
+        self.fine_control = False
+        self.min_size_change = tool_settings.min_size_change
+        # without the brush icon there is nothing else to preview
+        # the value with, so it is given to the view while dragging
+        self.preview_only = tool_settings.preview_only and self.preview_icon
+
+        # the drag range does not change until the next press,
+        # so the mapping to a brush size is only computed once
+        self.anchor_drag()
 
         self.can_resize_brush = True
+        if self.preview_only and tool_settings.catch_up_interval:
+            self.catch_up_timer.start(tool_settings.catch_up_interval)
         self.start_resizing.emit()
 
-    def resize_brush(self, *_):
-        """Resize the brush using the distance that was dragged
-        from the starting click position.
+    def anchor_drag(self):
+        """Compute the mapping of the drag, so that initial_press_position
+        matches the current brush_size.
         """
+        settings = self.drag_settings
+        self.new_resize_max = self.get_drag_distance(settings)
+        if self.fine_control:
+            self.new_resize_max *= settings.fine_factor
 
+        press_offset = self.get_press_offset()
+        self.drag_geometry = create_drag_geometry(
+            settings.drag_mode,
+            self.initial_press_position,
+            press_offset,
+            settings.drag_angle,
+        )
+        press_value = self.drag_geometry.project(self.initial_press_position)
+        if self.response_curve.is_linear:
+            self.drag_mapper = LinearDragMapper(
+                press_value - press_offset,
+                self.new_resize_max,
+                self.min_brush_size,
+                self.max_brush_size,
+                settings.slide_range,
+            )
+        else:
+            self.drag_mapper = self.response_curve.create_mapper(
+                press_value,
+                self.brush_size,
+                self.new_resize_max,
+                settings.slide_range,
+            )
+
+    def set_fine_control(self, enabled, position=None, *_):
+        """Enable or disable fine control. While resizing, the drag is
+        anchored again at given position and the current brush size,
+        so the size does not jump.
+
+        :param enabled: whether the fine modifier is held down
+        :type enabled: bool
+        :param position: the global position of the cursor,
+            defaults to the cursor position
+        :type position: QtCore.QPoint
+        """
+        if not self.modifier_fine_control or enabled == self.fine_control:
+            return
+        self.fine_control = enabled
         if not self.can_resize_brush:
             return
 
-        new_size = self.calculate_new_brush_size()
+        if position is None:
+            position = QtGui.QCursor.pos()
+        self.initial_press_position = QtCore.QPoint(position)
+        self.brush_size = self.brush_size_after_change
+        self.anchor_drag()
+
+    def update_brush_size(self, position=None, timestamp=None):
+        """Map the distance that was dragged from the starting click
+        position to the new brush size, see MapStage.
+        Returns whether the brush size changed.
+
+        :param position: the global position that was dragged to,
+            defaults to the cursor position
+        :type position: QtCore.QPoint
+        :param timestamp: the time of the move in milliseconds
+        :type timestamp: int
+        :rtype: bool
+        """
+        new_size = self.calculate_new_brush_size(position)
+
+        # the size is pinned at a limit of the range, or the move did
+        # not go along the drag, so there is nothing to update and
+        # no size that was held back from the view
+        if new_size == self.brush_size_after_change:
+            return False
+        self.move_timestamp = timestamp
         self.brush_size_after_change = new_size
-        self.set_brush_size(int(new_size))
+        return True
+
+    def accept_size(self, new_size):
+        """Confirm whether given size should be given to the view,
+        see DedupeStage. Skipped sizes count as suppressed updates.
+        """
+        # the view rebuilds the brush outline for every new size,
+        # so skip sizes that are the same or too close to the last one
+        if self.has_size_changed(new_size):
+            return True
+        self.suppressed_updates += 1
+        return False
+
+    def apply_brush_size(self):
+        """Give the view the latest brush size, while previewing."""
+        # ticks without a new size since the last one have nothing
+        # to apply, so they are not counted as suppressed
+        if self.brush_size_after_change == self.caught_up_size:
+            return
+        self.caught_up_size = self.brush_size_after_change
+        new_size = int(self.brush_size_after_change)
+        if self.accept_size(new_size):
+            self.set_brush_size(new_size)
 
     def end_resize(self, *_):
         """Resizing has stopped."""
+        if self.can_resize_brush and self.preview_only:
+            # apply the exact size that was previewed
+            self.catch_up_timer.stop()
+            new_size = int(self.brush_size_after_change)
+            if new_size != self.applied_brush_size:
+                self.set_brush_size(new_size)
+
         self.can_resize_brush = False
         self.end_resizing.emit()
 
@@ -111,43 +273,88 @@ class BrushSizeDriver(QtCore.QObject):
         # under the cursor matches the current brush size
         return self.initial_press_position.x() - abs(offset_distance)
 
-    def calculate_new_brush_size(self):
+    def get_press_offset(self):
+        """Get how far along the resize range the current brush size is."""
+        if self.response_curve.is_linear:
+            return self.initial_press_position.x() - self.get_starting_x_pos()
+        return (
+            self.response_curve.position_of(self.brush_size)
+            * self.new_resize_max
+        )
+
+    def calculate_new_brush_size(self, position=None):
         """Get the upated brush size using the distance that was dragged."""
-        # this establishes the distance that the user has to
-        # drag to resize the brush to its max or min size.
-        start_x = self.get_starting_x_pos()
-        end_x = start_x + self.new_resize_max
-        new_brush_size = remap(
-            QtGui.QCursor.pos().x(),
-            (start_x, end_x),
-            (self.min_brush_size, self.max_brush_size),
+        if position is None:
+            position = QtGui.QCursor.pos()
+        # the mapper also makes sure the new brush size
+        # does not go past the set brush range
+        return self.drag_mapper.map(self.drag_geometry.project(position))
+
+    def update_response_curve(self, settings):
+        """Rebuild the response curve if given settings changed it.
+
+        :type settings: BrushSettings
+        """
+        key = ResponseCurve.settings_key(
+            settings, *self.get_value_range(settings)
         )
-        # make sure the new brush size does not go past the set brush range
-        return clamp(self.min_brush_size, new_brush_size, self.max_brush_size)
+        if self.response_curve is None or self.response_curve.key != key:
+            self.response_curve = ResponseCurve(*key)
 
-    def set_brush_size(self, new_size):
-        """Set the current view's brush size."""
-        self.view_while_resizing.setBrushSize(new_size)
-        self.brush_size_changed.emit(new_size)
+    def has_size_changed(self, new_size):
+        """Confirm whether given size differs enough from the size that
+        was last applied to the view. The limits of the brush range can
+        always be reached, even if the change is less than min_size_change.
+        """
+        difference = abs(new_size - self.applied_brush_size)
+        if not difference:
+            return False
+        if difference >= self.min_size_change:
+            return True
+        return new_size in (
+            int(self.min_brush_size),
+            int(self.max_brush_size),
+        )
 
-    def is_brush_tool_toggled(self):
-        """Confirm whether the brush tool is the current tool."""
-        brush_tool = None
+    def read_value(self, view):
+        """Get the value that is dragged from given view."""
+        return view.brushSize()
 
-        for dock in Krita.instance().dockers():
-            if not dock.objectName() == KRITA_TOOL_BOX_NAME:
-                continue
+    def write_value(self, view, value):
+        """Give the dragged value to given view."""
+        view.setBrushSize(value)
 
-            brush_tool = dock.findChild(
-                QtWidgets.QToolButton,
-                KRITA_BRUSH_TOOL_NAME,
-                QtCore.Qt.FindChildrenRecursively,
-            )
+    def get_value_range(self, settings):
+        """Get the lowest and highest value that can be dragged to.
 
-        if not brush_tool:
-            return False
+        :type settings: BrushSettings
+        :rtype: tuple[int, int]
+        """
+        return (settings.min_brush_size, settings.max_brush_size)
+
+    def get_drag_distance(self, settings):
+        """Get how far to drag to go from the lowest to the highest value.
+
+        :type settings: BrushSettings
+        :rtype: int or float
+        """
+        return settings.max_size
+
+    def set_brush_size(self, new_size):
+        """Set the current view's brush size, see ApplyStage."""
+        self.applied_updates += 1
+        self.write_value(self.view_while_resizing, new_size)
+        self.applied_brush_size = new_size
+        self.brush_size_changed.emit(new_size)
 
-        return brush_tool.isChecked()
+    def reset_update_counters(self):
+        """Reset the amount of applied and suppressed view updates."""
+        self.applied_updates = 0
+        self.suppressed_updates = 0
+
+    def is_brush_tool_toggled(self):
+        """Confirm whether the brush tool is the current tool."""
+        return self.brush_tool_tracker.is_tool_toggled()
 
     def does_document_exist(self):
         """Confirm whether a document is open."""
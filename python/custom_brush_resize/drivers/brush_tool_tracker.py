@@ -0,0 +1,83 @@
+from krita import Krita
+
+from PyQt5 import QtCore, QtWidgets
+
+# For finding ui elements within krita
+KRITA_TOOL_BOX_NAME = "ToolBox"
+KRITA_BRUSH_TOOL_NAME = "KritaShape/KisToolBrush"
+
+
+def find_tool_button(qwindow, tool_name):
+    """Search the tool box of given main window for the button
+    of the tool with given name.
+    """
+    for dock in qwindow.findChildren(QtWidgets.QDockWidget):
+        if not dock.objectName() == KRITA_TOOL_BOX_NAME:
+            continue
+
+        tool_button = dock.findChild(
+            QtWidgets.QToolButton,
+            tool_name,
+            QtCore.Qt.FindChildrenRecursively,
+        )
+        if tool_button:
+            return tool_button
+    return None
+
+
+class BrushToolTracker(QtCore.QObject):
+    """Keeps track of whether a tool is checked in the tool box of
+    krita's active window.
+    The tool button is only searched for when the active window changes.
+    After that, its toggled signal keeps the checked state up to date.
+    The button is searched for again after it has been destroyed.
+    """
+
+    def __init__(self, tool_name=KRITA_BRUSH_TOOL_NAME, parent=None):
+        super(BrushToolTracker, self).__init__(parent)
+        self.tool_name = tool_name
+        self.is_toggled = False
+        # the main window of the tracked button, and the button itself
+        self.qwindow = None
+        self.tool_button = None
+
+    def track(self, qwindow, tool_button):
+        """Start tracking the checked state of given tool button,
+        which belongs to given main window.
+        """
+        self.untrack()
+        self.qwindow = qwindow
+        if tool_button is None:
+            return
+        self.tool_button = tool_button
+        self.is_toggled = tool_button.isChecked()
+        tool_button.toggled.connect(self._set_toggled)
+        tool_button.destroyed.connect(self._forget_tool_button)
+
+    def untrack(self):
+        """Stop tracking the tool button, if any."""
+        if self.tool_button is not None:
+            self.tool_button.toggled.disconnect(self._set_toggled)
+            self.tool_button.destroyed.disconnect(self._forget_tool_button)
+        self._forget_tool_button()
+
+    def is_tool_toggled(self):
+        """Confirm whether the tracked tool is the current tool
+        of the active window.
+        """
+        window = Krita.instance().activeWindow()
+        if window is None:
+            return False
+        qwindow = window.qwindow()
+        if qwindow is not self.qwindow or self.tool_button is None:
+            self.track(qwindow, find_tool_button(qwindow, self.tool_name))
+        return self.is_toggled
+
+    def _set_toggled(self, toggled):
+        self.is_toggled = toggled
+
+    def _forget_tool_button(self, *_):
+        # the button is a child of its window, which may be gone as well
+        self.qwindow = None
+        self.tool_button = None
+        self.is_toggled = False
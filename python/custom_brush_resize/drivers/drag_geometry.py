@@ -0,0 +1,99 @@
+import math
+
+
+DRAG_HORIZONTAL = "horizontal"
+DRAG_VERTICAL = "vertical"
+DRAG_RADIAL = "radial"
+DRAG_AXIS = "axis"
+DRAG_MODES = (DRAG_HORIZONTAL, DRAG_VERTICAL, DRAG_RADIAL, DRAG_AXIS)
+
+
+class HorizontalDragGeometry(object):
+    """Dragging to the right makes the brush bigger."""
+
+    __slots__ = ()
+
+    def project(self, position):
+        """Get how far along the drag given global position is."""
+        return position.x()
+
+
+class VerticalDragGeometry(object):
+    """Dragging up makes the brush bigger."""
+
+    __slots__ = ()
+
+    def project(self, position):
+        """Get how far along the drag given global position is."""
+        return -position.y()
+
+
+class AxisDragGeometry(object):
+    """Dragging along the axis at given angle makes the brush bigger.
+    The direction of the axis is computed once, so projecting a position
+    is two multiplications and an addition.
+    """
+
+    __slots__ = ("x_scale", "y_scale")
+
+    def __init__(self, angle):
+        """
+        :param angle: counter clockwise angle from the right, in degrees
+        :type angle: int or float
+        """
+        radians = math.radians(angle)
+        self.x_scale = math.cos(radians)
+        # the y axis of the screen points down
+        self.y_scale = -math.sin(radians)
+
+    def project(self, position):
+        """Get how far along the drag given global position is."""
+        return position.x() * self.x_scale + position.y() * self.y_scale
+
+
+class RadialDragGeometry(object):
+    """Dragging away from a centre makes the brush bigger, in any
+    direction. The centre is placed to the left of the pressed position,
+    at the distance of the current brush size from the smallest size,
+    so pressing does not change the brush size.
+    """
+
+    __slots__ = ("centre_x", "centre_y")
+
+    def __init__(self, press_position, press_offset):
+        """
+        :param press_position: the global position that was pressed
+        :type press_position: QtCore.QPoint
+        :param press_offset: how far along the drag the current
+            brush size is
+        :type press_offset: int or float
+        """
+        self.centre_x = press_position.x() - press_offset
+        self.centre_y = press_position.y()
+
+    def project(self, position):
+        """Get how far along the drag given global position is."""
+        return math.hypot(
+            position.x() - self.centre_x, position.y() - self.centre_y
+        )
+
+
+def create_drag_geometry(mode, press_position, press_offset, angle=0):
+    """Create the geometry for a drag in given mode.
+
+    :param mode: one of the DRAG_MODES, unknown modes drag horizontally
+    :type mode: str
+    :param press_position: the global position that was pressed
+    :type press_position: QtCore.QPoint
+    :param press_offset: how far along the drag the current brush size is
+    :type press_offset: int or float
+    :param angle: angle of the axis when dragging along an axis
+    :type angle: int or float
+    """
+    if mode == DRAG_VERTICAL:
+        return VerticalDragGeometry()
+    if mode == DRAG_RADIAL:
+        return RadialDragGeometry(press_position, press_offset)
+    if mode == DRAG_AXIS:
+        return AxisDragGeometry(angle)
+    return HorizontalDragGeometry()
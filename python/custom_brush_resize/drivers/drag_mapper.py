@@ -0,0 +1,82 @@
+class LinearDragMapper(object):
+    """Maps a drag position to a brush size.
+    The scale and offset of the mapping are computed once when the
+    drag starts, so mapping a position is one multiply-add and a clamp.
+
+    When sliding, a position past low or high moves the whole range
+    along with it, so dragging back changes the size straight away.
+    """
+
+    __slots__ = ("scale", "offset", "low", "high", "slide")
+
+    def __init__(self, start, distance, low, high, slide=False):
+        """
+        :param start: the position that maps to low
+        :type start: int or float
+        :param distance: how far to drag from start to reach high
+        :type distance: int or float
+        :param low: the lowest brush size
+        :type low: int or float
+        :param high: the highest brush size
+        :type high: int or float
+        :param slide: whether the range moves with positions past it
+        :type slide: bool
+        """
+        self.scale = (high - low) / float(distance)
+        self.offset = low - start * self.scale
+        self.low = low
+        self.high = high
+        self.slide = slide
+
+    def map(self, position):
+        """Get the brush size for given position, within low and high."""
+        size = position * self.scale + self.offset
+        if size < self.low:
+            if self.slide:
+                self.offset += self.low - size
+            return self.low
+        if size > self.high:
+            if self.slide:
+                self.offset += self.high - size
+            return self.high
+        return size
+
+
+class CurveDragMapper(object):
+    """Maps a drag position to a brush size through a lookup table
+    of sizes, see ResponseCurve. Like the LinearDragMapper, mapping
+    a position is one multiply-add and a clamp, followed by an index.
+    It slides the same way as the LinearDragMapper.
+    """
+
+    __slots__ = ("scale", "offset", "sizes", "last", "slide")
+
+    def __init__(self, start, distance, sizes, slide=False):
+        """
+        :param start: the position that maps to the first size
+        :type start: int or float
+        :param distance: how far to drag from start to reach the last size
+        :type distance: int or float
+        :param sizes: evenly spaced brush sizes along the distance
+        :type sizes: list[float]
+        :param slide: whether the range moves with positions past it
+        :type slide: bool
+        """
+        self.last = len(sizes) - 1
+        self.scale = self.last / float(distance)
+        self.offset = -start * self.scale
+        self.sizes = sizes
+        self.slide = slide
+
+    def map(self, position):
+        """Get the brush size for given position, within the table."""
+        index = position * self.scale + self.offset
+        if index <= 0:
+            if self.slide:
+                self.offset -= index
+            return self.sizes[0]
+        if index >= self.last:
+            if self.slide:
+                self.offset -= index - self.last
+            return self.sizes[self.last]
+        return self.sizes[int(index + 0.5)]
@@ -0,0 +1,51 @@
+from PyQt5 import QtCore
+
+
+class DriverRegistry(QtCore.QObject):
+    """Keeps the driver of every ShortcutListener binding.
+    When a binding is pressed, its driver is looked up once and kept as
+    the active driver, so every move of the drag goes straight to it.
+    """
+
+    def __init__(self, parent=None):
+        super(DriverRegistry, self).__init__(parent)
+        self.drivers = {}
+        self.active_driver = None
+
+    def register(self, name, driver):
+        """Let given driver handle the drags of the binding with given name.
+
+        :type name: str
+        :type driver: BrushSizeDriver
+        """
+        self.drivers[name] = driver
+
+    def get(self, name):
+        """Get the driver of the binding with given name."""
+        return self.drivers.get(name)
+
+    def start(self, name, position=None, timestamp=None):
+        """Start a drag with the driver of the binding with given name.
+        The drag of the previously active driver is ended first.
+        """
+        self.end()
+        driver = self.drivers.get(name)
+        if driver is None:
+            return
+        self.active_driver = driver
+        driver.start_resize(position, timestamp)
+
+    def set_fine_control(self, enabled, position=None, *_):
+        """Enable or disable fine control on the active driver.
+        Drags always start without it, see BrushSizeDriver.start_resize.
+        """
+        if self.active_driver is not None:
+            self.active_driver.set_fine_control(enabled, position)
+
+    def end(self, *_):
+        """End the drag of the active driver."""
+        driver = self.active_driver
+        if driver is None:
+            return
+        self.active_driver = None
+        driver.end_resize()
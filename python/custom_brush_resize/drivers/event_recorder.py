@@ -0,0 +1,170 @@
+import os
+import struct
+
+from PyQt5 import QtCore, QtGui
+
+
+# Every recording starts with this header, followed by a version number
+RECORDING_HEADER = b"CBRR"
+RECORDING_VERSION = 1
+RECORDING_EXTENSION = ".cbrr"
+
+# event type, key or button(s), global x, global y, timestamp in ms
+RECORD = struct.Struct("<HIiiI")
+
+KEY_EVENT_TYPES = frozenset(
+    [
+        QtCore.QEvent.KeyPress,
+        QtCore.QEvent.KeyRelease,
+    ]
+)
+BUTTON_EVENT_TYPES = frozenset(
+    [
+        QtCore.QEvent.MouseButtonPress,
+        QtCore.QEvent.MouseButtonRelease,
+        QtCore.QEvent.TabletPress,
+        QtCore.QEvent.TabletRelease,
+    ]
+)
+TABLET_EVENT_TYPES = frozenset(
+    [
+        QtCore.QEvent.TabletMove,
+        QtCore.QEvent.TabletPress,
+        QtCore.QEvent.TabletRelease,
+    ]
+)
+
+
+class EventRecorder(object):
+    """Writes the events that the ShortcutListener sees to a binary file.
+    Each event is stored as a fixed size record, see RECORD.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.recording_file = None
+        self.event_count = 0
+
+    @property
+    def is_recording(self):
+        """Confirm whether events are being written."""
+        return self.recording_file is not None
+
+    def start(self):
+        """Create the recording file and start accepting events."""
+        if self.is_recording:
+            return
+        if not os.path.isdir(os.path.dirname(self.file_path)):
+            os.makedirs(os.path.dirname(self.file_path))
+        self.recording_file = open(self.file_path, "wb")
+        self.recording_file.write(
+            RECORDING_HEADER + struct.pack("<B", RECORDING_VERSION)
+        )
+        self.event_count = 0
+
+    def stop(self):
+        """Write the remaining events and close the recording file."""
+        if not self.is_recording:
+            return
+        self.recording_file.close()
+        self.recording_file = None
+
+    def record(self, event):
+        """Write given key, mouse or tablet event to the recording."""
+        if not self.is_recording:
+            return
+
+        event_type = event.type()
+        x = y = 0
+        if event_type in KEY_EVENT_TYPES:
+            code = event.key()
+        else:
+            position = event.globalPos()
+            x = position.x()
+            y = position.y()
+            if event_type in BUTTON_EVENT_TYPES:
+                code = int(event.button())
+            else:
+                code = int(event.buttons())
+
+        self.recording_file.write(
+            RECORD.pack(
+                int(event_type),
+                code & 0xFFFFFFFF,
+                x,
+                y,
+                event.timestamp() & 0xFFFFFFFF,
+            )
+        )
+        self.event_count += 1
+
+
+def read_recording(file_path):
+    """Read all records from given recording file.
+
+    :param file_path: the recording to read
+    :type file_path: str
+    :return: event type, key or button(s), global x, global y and timestamp
+        for each recorded event
+    :rtype: list[tuple[int, int, int, int, int]]
+    """
+    with open(file_path, "rb") as _file:
+        data = _file.read()
+
+    header_size = len(RECORDING_HEADER) + 1
+    if data[: len(RECORDING_HEADER)] != RECORDING_HEADER:
+        raise ValueError(f"{file_path} is not an input recording")
+    if data[len(RECORDING_HEADER)] != RECORDING_VERSION:
+        raise ValueError(f"Unsupported recording version in {file_path}")
+
+    end = len(data) - (len(data) - header_size) % RECORD.size
+    return list(RECORD.iter_unpack(data[header_size:end]))
+
+
+def create_event(record):
+    """Build the Qt event that given record was written from."""
+    event_type, code, x, y, timestamp = record
+    event_type = QtCore.QEvent.Type(event_type)
+
+    if event_type in KEY_EVENT_TYPES:
+        event = QtGui.QKeyEvent(event_type, code, QtCore.Qt.NoModifier)
+    elif event_type in TABLET_EVENT_TYPES:
+        position = QtCore.QPointF(x, y)
+        button = QtCore.Qt.MouseButton(code)
+        buttons = QtCore.Qt.MouseButtons(code)
+        if event_type not in BUTTON_EVENT_TYPES:
+            button = QtCore.Qt.NoButton
+        event = QtGui.QTabletEvent(
+            event_type,
+            position,
+            position,
+            QtGui.QTabletEvent.Stylus,
+            QtGui.QTabletEvent.Pen,
+            1.0,
+            0,
+            0,
+            0.0,
+            0.0,
+            0,
+            QtCore.Qt.NoModifier,
+            0,
+            button,
+            buttons,
+        )
+    else:
+        position = QtCore.QPointF(x, y)
+        button = QtCore.Qt.MouseButton(code)
+        buttons = QtCore.Qt.MouseButtons(code)
+        if event_type not in BUTTON_EVENT_TYPES:
+            button = QtCore.Qt.NoButton
+        event = QtGui.QMouseEvent(
+            event_type,
+            position,
+            position,
+            button,
+            buttons,
+            QtCore.Qt.NoModifier,
+        )
+
+    event.setTimestamp(timestamp)
+    return event
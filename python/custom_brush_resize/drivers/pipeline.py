@@ -0,0 +1,330 @@
+import time
+
+from PyQt5 import QtCore
+
+from .pointer_filter import OneEuroFilter
+
+
+STAGE_COALESCE = "coalesce"
+STAGE_SMOOTH = "smooth"
+STAGE_MAP = "map"
+STAGE_PREVIEW = "preview"
+STAGE_QUANTIZE = "quantize"
+STAGE_DEDUPE = "dedupe"
+STAGE_APPLY = "apply"
+
+# Stages in the order that a sample goes through them
+PIPELINE_STAGES = (
+    STAGE_COALESCE,
+    STAGE_SMOOTH,
+    STAGE_MAP,
+    STAGE_PREVIEW,
+    STAGE_QUANTIZE,
+    STAGE_DEDUPE,
+    STAGE_APPLY,
+)
+
+# Stages that are always part of the pipeline
+REQUIRED_STAGES = frozenset([STAGE_MAP, STAGE_QUANTIZE, STAGE_APPLY])
+
+
+class Sample(object):
+    """A single move of a drag, as it goes through the pipeline."""
+
+    __slots__ = ("position", "timestamp", "value", "size")
+
+    def __init__(self, position, timestamp):
+        self.position = position
+        self.timestamp = timestamp
+        # the mapped value, and the integer value for the view
+        self.value = None
+        self.size = None
+
+
+class PipelineStage(object):
+    """One step of the Pipeline.
+    process returns the sample for the next stage, or None to stop.
+    The pipeline keeps the counters up to date while profiling.
+    """
+
+    __slots__ = ("driver", "calls", "dropped", "elapsed")
+
+    name = None
+
+    def __init__(self):
+        self.driver = None
+        self.reset_counters()
+
+    def reset_counters(self):
+        """Reset the amount of calls, dropped samples and time spent."""
+        self.calls = 0
+        self.dropped = 0
+        self.elapsed = 0
+
+    def start(self, driver, sample):
+        """A drag started with given driver at given sample."""
+        self.driver = driver
+
+    def process(self, sample):
+        return sample
+
+    def flush(self):
+        """Get the sample that the stage held back, if any."""
+        return None
+
+
+class CoalesceStage(PipelineStage):
+    """Collapses all samples within the interval into the latest one,
+    which continues through the pipeline once the interval is over.
+    """
+
+    __slots__ = ("pending", "timer", "resume", "__weakref__")
+
+    name = STAGE_COALESCE
+
+    def __init__(self, interval, resume=None):
+        """
+        :param interval: milliseconds to collapse samples within
+        :type interval: int
+        :param resume: called with the held back sample once the
+            interval is over, set by the Pipeline
+        :type resume: callable
+        """
+        super(CoalesceStage, self).__init__()
+        self.pending = None
+        self.resume = resume
+        self.timer = QtCore.QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self._resume_pending)
+
+    def start(self, driver, sample):
+        super(CoalesceStage, self).start(driver, sample)
+        self.timer.stop()
+        self.pending = None
+
+    def process(self, sample):
+        self.pending = sample
+        if not self.timer.isActive():
+            self.timer.start()
+        return None
+
+    def flush(self):
+        self.timer.stop()
+        sample = self.pending
+        self.pending = None
+        return sample
+
+    def _resume_pending(self):
+        sample = self.flush()
+        if sample is not None and self.resume is not None:
+            self.resume(sample)
+
+
+class SmoothStage(PipelineStage):
+    """Smooths the position of the samples, see OneEuroFilter."""
+
+    __slots__ = ("pointer_filter",)
+
+    name = STAGE_SMOOTH
+
+    def __init__(self, min_cutoff, beta, prediction):
+        super(SmoothStage, self).__init__()
+        self.pointer_filter = OneEuroFilter(min_cutoff, beta, prediction)
+
+    def start(self, driver, sample):
+        super(SmoothStage, self).start(driver, sample)
+        self.pointer_filter.reset(sample.position, sample.timestamp)
+
+    def process(self, sample):
+        sample.position = self.pointer_filter.filter(
+            sample.position, sample.timestamp
+        )
+        return sample
+
+
+class MapStage(PipelineStage):
+    """Maps the position of the sample to a value of the driver,
+    see BrushSizeDriver.update_brush_size. Samples that map to the
+    current value are dropped, for example while the value is pinned
+    at a limit of the range.
+    """
+
+    __slots__ = ()
+
+    name = STAGE_MAP
+
+    def process(self, sample):
+        driver = self.driver
+        if not driver.update_brush_size(sample.position, sample.timestamp):
+            return None
+        sample.value = driver.brush_size_after_change
+        return sample
+
+
+class PreviewStage(PipelineStage):
+    """Lets given callback show the mapped value, for example with the
+    brush icon, before the view is updated.
+    """
+
+    __slots__ = ("callback",)
+
+    name = STAGE_PREVIEW
+
+    def __init__(self, callback):
+        super(PreviewStage, self).__init__()
+        self.callback = callback
+
+    def process(self, sample):
+        self.callback(self.driver)
+        return sample
+
+
+class QuantizeStage(PipelineStage):
+    """Turns the mapped value into the integer value for the view."""
+
+    __slots__ = ()
+
+    name = STAGE_QUANTIZE
+
+    def process(self, sample):
+        sample.size = int(sample.value)
+        return sample
+
+
+class DedupeStage(PipelineStage):
+    """Drops sizes that are the same or too close to the size that was
+    last given to the view, see BrushSizeDriver.accept_size.
+    """
+
+    __slots__ = ()
+
+    name = STAGE_DEDUPE
+
+    def process(self, sample):
+        driver = self.driver
+        if driver.preview_only or driver.accept_size(sample.size):
+            return sample
+        return None
+
+
+class ApplyStage(PipelineStage):
+    """Gives the size to the view, unless the driver is previewing."""
+
+    __slots__ = ()
+
+    name = STAGE_APPLY
+
+    def process(self, sample):
+        driver = self.driver
+        if not driver.preview_only:
+            driver.set_brush_size(sample.size)
+        return sample
+
+
+class Pipeline(object):
+    """Runs every move of a drag through a list of stages.
+    While profiling, every stage counts its calls, the samples it
+    dropped and the nanoseconds it took.
+    """
+
+    __slots__ = ("stages", "profile")
+
+    def __init__(self, stages, profile=False):
+        """
+        :param stages: the stages in the order a sample goes through them
+        :type stages: list[PipelineStage]
+        :param profile: whether to time every stage
+        :type profile: bool
+        """
+        self.stages = stages
+        self.profile = profile
+        for index, stage in enumerate(stages):
+            if isinstance(stage, CoalesceStage):
+                stage.resume = self._resumer(index + 1)
+
+    def _resumer(self, first):
+        return lambda sample: self.process(sample, first)
+
+    def start(self, driver, sample):
+        """A drag started with given driver at given sample."""
+        for stage in self.stages:
+            stage.start(driver, sample)
+
+    def process(self, sample, first=0):
+        """Run given sample through the stages, starting at given index.
+        Returns the sample, or None if a stage dropped it.
+        """
+        stages = self.stages
+        if not self.profile:
+            for index in range(first, len(stages)):
+                sample = stages[index].process(sample)
+                if sample is None:
+                    return None
+            return sample
+
+        for index in range(first, len(stages)):
+            stage = stages[index]
+            start = time.perf_counter_ns()
+            sample = stage.process(sample)
+            stage.elapsed += time.perf_counter_ns() - start
+            stage.calls += 1
+            if sample is None:
+                stage.dropped += 1
+                return None
+        return sample
+
+    def flush(self):
+        """Run the samples that stages held back through the rest
+        of the pipeline.
+        """
+        for index, stage in enumerate(self.stages):
+            sample = stage.flush()
+            if sample is not None:
+                self.process(sample, index + 1)
+
+    def reset_counters(self):
+        """Reset the counters of every stage."""
+        for stage in self.stages:
+            stage.reset_counters()
+
+
+def create_pipeline(settings, preview_callback):
+    """Create the pipeline for given settings. Optional stages are only
+    added when they are listed in the pipeline_stages setting, and when
+    their own setting turns them on.
+
+    :type settings: BrushSettings
+    :param preview_callback: called with the driver for the preview stage
+    :type preview_callback: callable
+    :rtype: Pipeline
+    """
+    enabled = REQUIRED_STAGES.union(settings.pipeline_stages)
+    stages = []
+    for name in PIPELINE_STAGES:
+        if name not in enabled:
+            continue
+        if name == STAGE_COALESCE:
+            if settings.coalesce_interval:
+                stages.append(CoalesceStage(settings.coalesce_interval))
+        elif name == STAGE_SMOOTH:
+            if settings.smoothing:
+                stages.append(
+                    SmoothStage(
+                        settings.smoothing_cutoff,
+                        settings.smoothing_speed_factor,
+                        settings.prediction,
+                    )
+                )
+        elif name == STAGE_MAP:
+            stages.append(MapStage())
+        elif name == STAGE_PREVIEW:
+            stages.append(PreviewStage(preview_callback))
+        elif name == STAGE_QUANTIZE:
+            stages.append(QuantizeStage())
+        elif name == STAGE_DEDUPE:
+            stages.append(DedupeStage())
+        elif name == STAGE_APPLY:
+            stages.append(ApplyStage())
+    return Pipeline(stages, settings.profile_pipeline)
@@ -0,0 +1,107 @@
+import math
+
+from PyQt5 import QtCore
+
+
+# Cutoff frequency in Hz used to smooth the speed of the pointer
+DERIVATIVE_CUTOFF = 1.0
+
+
+def smoothing_factor(cutoff, interval):
+    """Get the weight of a new sample for a low-pass filter with
+    given cutoff frequency in Hz, sampled every interval seconds.
+    """
+    time_constant = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + time_constant / interval)
+
+
+class OneEuroFilter(object):
+    """Adaptive low-pass filter for pointer positions, see
+    https://gery.casiez.net/1euro/
+
+    While the pointer moves slowly, the cutoff frequency stays close to
+    min_cutoff and jitter is smoothed away. The faster it moves, the
+    higher the cutoff, so the filter does not lag behind a quick drag.
+    The smoothed speed is also used to predict where the pointer will
+    be prediction milliseconds from now, to hide some of the latency.
+    """
+
+    __slots__ = (
+        "min_cutoff",
+        "beta",
+        "prediction",
+        "x",
+        "y",
+        "raw_x",
+        "raw_y",
+        "speed_x",
+        "speed_y",
+        "timestamp",
+    )
+
+    def __init__(self, min_cutoff=1.0, beta=0.05, prediction=0.0):
+        """
+        :param min_cutoff: the cutoff frequency in Hz of a still pointer
+        :type min_cutoff: float
+        :param beta: how much the cutoff frequency goes up for every
+            pixel per second that the pointer moves
+        :type beta: float
+        :param prediction: how many milliseconds to predict ahead
+        :type prediction: float
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.prediction = prediction
+        self.x = None
+        self.y = None
+        self.raw_x = None
+        self.raw_y = None
+        self.speed_x = 0.0
+        self.speed_y = 0.0
+        self.timestamp = 0
+
+    def reset(self, position, timestamp):
+        """Start filtering from given position, without any speed."""
+        self.x = self.raw_x = float(position.x())
+        self.y = self.raw_y = float(position.y())
+        self.speed_x = 0.0
+        self.speed_y = 0.0
+        self.timestamp = timestamp or 0
+
+    def filter(self, position, timestamp):
+        """Get the smoothed and predicted position for given position.
+
+        :param position: the global position of the pointer
+        :type position: QtCore.QPoint
+        :param timestamp: the time of the position in milliseconds
+        :type timestamp: int
+        :rtype: QtCore.QPoint
+        """
+        if self.x is None:
+            self.reset(position, timestamp)
+            return position
+
+        # moves can share a timestamp, count them as one ms apart
+        interval = max(timestamp - self.timestamp, 1) / 1000.0
+        self.timestamp = timestamp
+
+        # smooth the speed of the pointer first
+        x = position.x()
+        y = position.y()
+        alpha = smoothing_factor(DERIVATIVE_CUTOFF, interval)
+        self.speed_x += alpha * ((x - self.raw_x) / interval - self.speed_x)
+        self.speed_y += alpha * ((y - self.raw_y) / interval - self.speed_y)
+        self.raw_x = x
+        self.raw_y = y
+
+        # then smooth the position, less so when moving fast
+        speed = math.hypot(self.speed_x, self.speed_y)
+        alpha = smoothing_factor(self.min_cutoff + self.beta * speed, interval)
+        self.x += alpha * (x - self.x)
+        self.y += alpha * (y - self.y)
+
+        ahead = self.prediction / 1000.0
+        return QtCore.QPoint(
+            round(self.x + self.speed_x * ahead),
+            round(self.y + self.speed_y * ahead),
+        )
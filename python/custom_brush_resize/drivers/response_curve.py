@@ -0,0 +1,198 @@
+import bisect
+import math
+
+from .drag_mapper import CurveDragMapper
+from ..utils import clamp
+
+
+CURVE_LINEAR = "linear"
+CURVE_EXPONENTIAL = "exponential"
+CURVE_LOGARITHMIC = "logarithmic"
+CURVE_SPLINE = "spline"
+RESPONSE_CURVES = (
+    CURVE_LINEAR,
+    CURVE_EXPONENTIAL,
+    CURVE_LOGARITHMIC,
+    CURVE_SPLINE,
+)
+
+# Amount of brush sizes that are precomputed along the drag range
+LOOKUP_TABLE_SIZE = 8192
+
+
+def exponential_curve(strength):
+    """Same curve as the KisSliderSpinBox.exponent_ratio,
+    gives more control over the small brush sizes.
+    """
+    return lambda value: pow(value, strength)
+
+
+def logarithmic_curve(strength):
+    """Gives more control over the big brush sizes."""
+    steepness = pow(10.0, strength) - 1.0
+    if steepness <= 0:
+        return lambda value: value
+    return lambda value: math.log1p(value * steepness) / math.log1p(
+        steepness
+    )
+
+
+def spline_curve(points):
+    """Monotone cubic spline (Fritsch-Carlson) through given points.
+    Points are kept within 0-1 and the curve always starts at (0, 0)
+    and ends at (1, 1). A point can not be lower than the point before
+    it, so a drag to the right never makes the brush smaller.
+
+    :param points: the x and y position of each point
+    :type points: list[tuple[float, float]]
+    :rtype: callable
+    """
+    curve_points = {0.0: 0.0, 1.0: 1.0}
+    for x, y in points:
+        curve_points[clamp(0.0, float(x), 1.0)] = clamp(0.0, float(y), 1.0)
+
+    xs = sorted(curve_points)
+    ys = []
+    for x in xs:
+        ys.append(max(curve_points[x], ys[-1] if ys else 0.0))
+
+    secants = [
+        (ys[i + 1] - ys[i]) / (xs[i + 1] - xs[i]) for i in range(len(xs) - 1)
+    ]
+    tangents = [secants[0]]
+    for i in range(1, len(secants)):
+        if secants[i - 1] * secants[i] <= 0:
+            tangents.append(0.0)
+        else:
+            tangents.append((secants[i - 1] + secants[i]) * 0.5)
+    tangents.append(secants[-1])
+
+    # limit the tangents, so the curve does not overshoot a point
+    for i, secant in enumerate(secants):
+        if not secant:
+            tangents[i] = tangents[i + 1] = 0.0
+            continue
+        a = tangents[i] / secant
+        b = tangents[i + 1] / secant
+        length = a * a + b * b
+        if length > 9.0:
+            scale = 3.0 / math.sqrt(length)
+            tangents[i] = scale * a * secant
+            tangents[i + 1] = scale * b * secant
+
+    def curve(value):
+        i = min(bisect.bisect_right(xs, value) - 1, len(secants) - 1)
+        width = xs[i + 1] - xs[i]
+        t = (value - xs[i]) / width
+        t2 = t * t
+        t3 = t2 * t
+        return (
+            (2 * t3 - 3 * t2 + 1) * ys[i]
+            + (t3 - 2 * t2 + t) * width * tangents[i]
+            + (-2 * t3 + 3 * t2) * ys[i + 1]
+            + (t3 - t2) * width * tangents[i + 1]
+        )
+
+    return curve
+
+
+class ResponseCurve(object):
+    """Lookup table with the brush size for evenly spaced positions
+    along the drag range, following one of the RESPONSE_CURVES.
+    The table only depends on the settings, so it is built when they
+    change instead of every time a drag starts.
+    """
+
+    __slots__ = ("key", "name", "low", "high", "sizes")
+
+    def __init__(self, name, strength, points, low, high):
+        """
+        :param name: one of the RESPONSE_CURVES
+        :type name: str
+        :param strength: exponent of the exponential curve, or steepness
+            of the logarithmic curve
+        :type strength: float
+        :param points: control points of the spline curve
+        :type points: list[tuple[float, float]]
+        :param low: the lowest brush size
+        :type low: int or float
+        :param high: the highest brush size
+        :type high: int or float
+        """
+        self.key = (name, strength, points, low, high)
+        self.name = name
+        self.low = low
+        self.high = high
+        self.sizes = None
+        if self.is_linear:
+            return
+
+        if name == CURVE_EXPONENTIAL:
+            curve = exponential_curve(strength)
+        elif name == CURVE_LOGARITHMIC:
+            curve = logarithmic_curve(strength)
+        else:
+            curve = spline_curve(points)
+
+        last = float(LOOKUP_TABLE_SIZE - 1)
+        span = high - low
+        self.sizes = [
+            low + curve(i / last) * span for i in range(LOOKUP_TABLE_SIZE)
+        ]
+
+    @staticmethod
+    def settings_key(settings, low, high):
+        """Get the settings that the lookup table is built from.
+
+        :type settings: BrushSettings
+        :param low: the lowest value of the driver
+        :param high: the highest value of the driver
+        :rtype: tuple
+        """
+        return (
+            settings.response_curve,
+            settings.curve_strength,
+            settings.curve_points,
+            low,
+            high,
+        )
+
+    @property
+    def is_linear(self):
+        """Confirm whether sizes follow the drag without a lookup table."""
+        return self.name not in RESPONSE_CURVES[1:]
+
+    def position_of(self, brush_size):
+        """Get how far along the drag range given brush size is.
+
+        :rtype: float
+        """
+        last = LOOKUP_TABLE_SIZE - 1
+        index = bisect.bisect_left(self.sizes, brush_size)
+        if index <= 0:
+            return 0.0
+        if index > last:
+            return 1.0
+
+        # interpolate between the two closest sizes of the table
+        low = self.sizes[index - 1]
+        high = self.sizes[index]
+        fraction = (brush_size - low) / (high - low) if high > low else 0.0
+        return (index - 1 + fraction) / float(last)
+
+    def create_mapper(self, press_position, brush_size, distance, slide=False):
+        """Create a mapper that follows this curve, where given press
+        position matches the current brush size.
+
+        :param press_position: the position that was pressed
+        :type press_position: int or float
+        :param brush_size: the brush size when the drag started
+        :type brush_size: int or float
+        :param distance: how far to drag to go through the whole curve
+        :type distance: int or float
+        :param slide: whether the curve moves with positions past it
+        :type slide: bool
+        :rtype: CurveDragMapper
+        """
+        start = press_position - self.position_of(brush_size) * distance
+        return CurveDragMapper(start, distance, self.sizes, slide)
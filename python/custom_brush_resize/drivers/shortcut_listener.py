@@ -1,15 +1,136 @@
-from PyQt5 import QtWidgets, QtCore
+from PyQt5 import QtWidgets, QtCore, QtGui
 
-from ..ui.config import text_input_to_buttons
+from ..ui.config import text_input_to_buttons, text_to_keys
 
 
-ACCEPTED_EVENT_TYPES = [
-    QtCore.QEvent.KeyRelease,
-    QtCore.QEvent.MouseButtonRelease,
-    QtCore.QEvent.KeyPress,
-    QtCore.QEvent.MouseButtonPress,
-    QtCore.QEvent.MouseMove,
-]
+# Name of the binding that set_shortcut changes
+DEFAULT_BINDING = "size"
+
+# Events watched by the always-on ShortcutListener
+ACCEPTED_EVENT_TYPES = frozenset(
+    [
+        QtCore.QEvent.KeyRelease,
+        QtCore.QEvent.MouseButtonRelease,
+        QtCore.QEvent.TabletRelease,
+        QtCore.QEvent.KeyPress,
+        QtCore.QEvent.MouseButtonPress,
+        QtCore.QEvent.TabletPress,
+    ]
+)
+
+BUTTON_PRESS_EVENT_TYPES = frozenset(
+    [
+        QtCore.QEvent.MouseButtonPress,
+        QtCore.QEvent.TabletPress,
+    ]
+)
+
+BUTTON_RELEASE_EVENT_TYPES = frozenset(
+    [
+        QtCore.QEvent.MouseButtonRelease,
+        QtCore.QEvent.TabletRelease,
+    ]
+)
+
+# Mouse events, which are skipped when they were synthesized from a
+# tablet event, as the tablet event itself is handled
+MOUSE_EVENT_TYPES = frozenset(
+    [
+        QtCore.QEvent.MouseButtonRelease,
+        QtCore.QEvent.MouseButtonPress,
+        QtCore.QEvent.MouseMove,
+    ]
+)
+
+# Events watched by the DragTracker while it is armed
+DRAG_EVENT_TYPES = frozenset(
+    [
+        QtCore.QEvent.MouseMove,
+        QtCore.QEvent.TabletMove,
+    ]
+)
+
+
+class CompiledShortcut(object):
+    """A shortcut that has been parsed once into frozen sets of
+    keys and mouse buttons, so the shortcut text is not re-parsed
+    on every event. See `CompiledBindings` for the bits that the
+    pressed state is kept in.
+    """
+
+    __slots__ = ("text", "keys", "buttons")
+
+    def __init__(self, text=None):
+        buttons, keys = text_input_to_buttons(text) if text else ([], [])
+        self.text = text
+        self.keys = frozenset(keys)
+        self.buttons = frozenset(buttons)
+
+
+class CompiledBindings(object):
+    """Several shortcuts, each bound to a name, compiled into one
+    set of key and button bits that is shared between them.
+
+    The chord of a binding is the mask of the bits of its shortcut.
+    chords maps each chord back to the name of its binding, so the
+    binding that is held down is found with a single dict lookup on
+    `ShortcutListener.pressed_mask`, no matter how many bindings exist.
+    When two bindings have the same chord, the last one is used.
+    """
+
+    __slots__ = ("bindings", "key_bits", "button_bits", "chords")
+
+    def __init__(self, bindings=None):
+        self.bindings = {}
+        self.key_bits = {}
+        self.button_bits = {}
+        self.chords = {}
+
+        bit = 1
+        for name, text in (bindings or {}).items():
+            shortcut = CompiledShortcut(text)
+            chord = 0
+            for button in shortcut.buttons:
+                if button not in self.button_bits:
+                    self.button_bits[button] = bit
+                    bit <<= 1
+                chord |= self.button_bits[button]
+            for key in shortcut.keys:
+                if key not in self.key_bits:
+                    self.key_bits[key] = bit
+                    bit <<= 1
+                chord |= self.key_bits[key]
+
+            # an empty chord would match while nothing is pressed
+            if not chord:
+                continue
+            self.bindings[name] = shortcut
+            self.chords[chord] = name
+
+
+class DragTracker(QtCore.QObject):
+    """Second stage of the ShortcutListener.
+    It is only installed as an event filter while part of the shortcut
+    is held down, so mouse moves are not processed while painting.
+    """
+
+    def __init__(self, listener):
+        super(DragTracker, self).__init__(listener)
+        self.listener = listener
+        self.armed = False
+
+    def eventFilter(self, _, event):
+        """Pass mouse and tablet moves on to the listener."""
+        event_type = event.type()
+        if event_type not in DRAG_EVENT_TYPES:
+            return False
+        if (
+            event_type == QtCore.QEvent.MouseMove
+            and event.source() != QtCore.Qt.MouseEventNotSynthesized
+        ):
+            return False
+        self.listener.process_move(event)
+        return False
 
 
 class ShortcutListener(QtWidgets.QMdiArea):
@@ -17,47 +138,158 @@ class ShortcutListener(QtWidgets.QMdiArea):
     The eventFilter of this object will start running
     from the moment krita starts.
     It will monitor the button and key presses from the user.
+    Mouse moves are only monitored by its DragTracker, which is
+    armed once a key or button of a binding is pressed and
+    disarmed when all of them are released.
+
+    Every binding is a shortcut with a name. The listener keeps track of
+    which binding is held down, see active_binding, and lets everyone
+    know through binding_pressed and binding_released.
     """
 
-    button_pressed = QtCore.pyqtSignal(QtCore.Qt.MouseButton)
+    # button, global position and timestamp of the press
+    button_pressed = QtCore.pyqtSignal(
+        QtCore.Qt.MouseButton, QtCore.QPoint, "qulonglong"
+    )
     button_released = QtCore.pyqtSignal(QtCore.Qt.MouseButton)
     key_pressed = QtCore.pyqtSignal(QtCore.Qt.Key)
     key_released = QtCore.pyqtSignal(QtCore.Qt.Key)
 
+    # name of the binding, global position and timestamp of the press
+    binding_pressed = QtCore.pyqtSignal(str, QtCore.QPoint, "qulonglong")
+    binding_released = QtCore.pyqtSignal(str)
+
+    # whether the modifier is held, global position and timestamp
+    modifier_toggled = QtCore.pyqtSignal(bool, QtCore.QPoint, "qulonglong")
+
     shortcut_pressed = QtCore.pyqtSignal(bool)
-    shortcut_pressed_while_dragging = QtCore.pyqtSignal(bool)
+    # global position and timestamp of the latest move
+    shortcut_pressed_while_dragging = QtCore.pyqtSignal(
+        QtCore.QPoint, "qulonglong"
+    )
 
     def __init__(self, shortcut=None, parent=None):
         super(ShortcutListener, self).__init__(parent=parent)
-        self.shortcut = shortcut
+        self.bindings = {}
+        if shortcut:
+            self.bindings[DEFAULT_BINDING] = shortcut
+        self.compiled_bindings = None
+
+        # one bit per key and button of the bindings that is held down
+        self.pressed_mask = 0
+
+        # name of the binding whose chord matches the pressed_mask
+        self.active_binding = None
 
-        self.shortcut_keys_pressed = {}
-        self.shortcut_buttons_pressed = {}
+        # keys that make up the modifier, with one bit each, and the
+        # bits of the modifier keys that are held down
+        self.modifier = None
+        self.modifier_bits = {}
+        self.modifier_mask = 0
+        self.pressed_modifier_mask = 0
+
+        # global position of the latest press, release or move while
+        # armed, so key events do not have to poll the cursor
+        self.last_position = None
+
+        # the object that the listener is installed on
+        self.event_source = None
+        self.drag_tracker = DragTracker(self)
+
+        # optional EventRecorder that all accepted events are written to
+        self.recorder = None
 
         self.initialize_shortcut_presses()
 
+    def install(self, event_source=None):
+        """Start listening to the events of given object.
+        Defaults to listening to the whole application.
+        """
+        self.uninstall()
+        self.event_source = event_source or QtWidgets.QApplication.instance()
+        self.event_source.installEventFilter(self)
+
+    def uninstall(self):
+        """Stop listening to events."""
+        self.disarm()
+        if self.event_source is not None:
+            self.event_source.removeEventFilter(self)
+        self.event_source = None
+
+    def arm(self):
+        """Start tracking mouse moves."""
+        if self.drag_tracker.armed:
+            return
+        self.drag_tracker.armed = True
+        if self.event_source is not None:
+            self.event_source.installEventFilter(self.drag_tracker)
+
+    def disarm(self):
+        """Stop tracking mouse moves."""
+        # moves are not followed anymore, so the position gets stale
+        self.last_position = None
+        if not self.drag_tracker.armed:
+            return
+        self.drag_tracker.armed = False
+        if self.event_source is not None:
+            self.event_source.removeEventFilter(self.drag_tracker)
+
+    @property
+    def shortcut(self):
+        """The shortcut of the default binding."""
+        return self.bindings.get(DEFAULT_BINDING)
+
     def set_shortcut(self, shortcut):
         """Set shortcut to given shortcut."""
-        self.shortcut = shortcut
+        self.set_binding(DEFAULT_BINDING, shortcut)
+
+    def set_binding(self, name, shortcut):
+        """Bind given shortcut to given name.
+        An empty shortcut removes the binding.
+        """
+        bindings = dict(self.bindings)
+        bindings[name] = shortcut
+        self.set_bindings(bindings)
+
+    def set_bindings(self, bindings):
+        """Replace all bindings with given shortcut for each name.
+        The press state is only reset when the bindings changed.
+        """
+        bindings = {name: text for name, text in bindings.items() if text}
+        if bindings == self.bindings and self.compiled_bindings:
+            return
+        self.bindings = bindings
         self.initialize_shortcut_presses()
 
     def initialize_shortcut_presses(self):
         """Set the intial press state for each key and
-        button in the current shortcut."""
-        buttons, keys = text_input_to_buttons(self.shortcut)
-        self.shortcut_buttons_pressed.clear()
-        self.shortcut_keys_pressed.clear()
-        for button in buttons:
-            self.shortcut_buttons_pressed[button] = False
-        for key in keys:
-            self.shortcut_keys_pressed[key] = False
+        button in the current bindings."""
+        self.compiled_bindings = CompiledBindings(self.bindings)
+        self.pressed_mask = 0
+        self.active_binding = None
+        self.disarm()
+
+    def set_modifier(self, modifier):
+        """Set the keys that toggle modifier_toggled when all of them
+        are held down. An empty modifier disables it.
+        """
+        if modifier == self.modifier:
+            return
+        self.modifier = modifier
+        self.modifier_bits = {}
+        bit = 1
+        for key in text_to_keys(modifier) if modifier else []:
+            self.modifier_bits[key] = bit
+            bit <<= 1
+        self.modifier_mask = bit - 1
+        self.pressed_modifier_mask = 0
 
     def eventFilter(self, _, event):
         """Overriding evenFilter to catch accepted event types.
         The mouse button and key presses are monitored here.
         When the user presses/releases a key or mouse button that
-        belongs to the current shortcut, it's `pressed` state is
-        updated in shortcut_buttons_pressed or shortcut_keys_pressed.
+        belongs to one of the bindings, its bit is set or cleared
+        in pressed_mask.
         """
         event_type = event.type()
 
@@ -65,65 +297,147 @@ class ShortcutListener(QtWidgets.QMdiArea):
         if event_type not in ACCEPTED_EVENT_TYPES:
             return False
 
+        # the tablet event that the mouse event was made from is handled
+        if (
+            event_type in MOUSE_EVENT_TYPES
+            and event.source() != QtCore.Qt.MouseEventNotSynthesized
+        ):
+            return False
+
+        if self.recorder is not None:
+            self.recorder.record(event)
+
         # Evaluate asscepted event types
         # Is user pressing a shortcut key?
         if event_type == QtCore.QEvent.KeyPress:
-            if self._can_press_key(event.key()):
-                self.shortcut_keys_pressed[event.key()] = True
+            bit = self.modifier_bits.get(event.key(), 0)
+            if bit and not self.pressed_modifier_mask & bit:
+                self._toggle_modifier(bit, event)
+
+            bit = self.compiled_bindings.key_bits.get(event.key(), 0)
+            if bit and not self.pressed_mask & bit:
+                self._press(bit)
                 self.key_pressed.emit(event.key())
+                self._update_active_binding(event)
 
         # User released shorcut key
         if event_type == QtCore.QEvent.KeyRelease:
-            self._release_pressed(event.key())
+            bit = self.modifier_bits.get(event.key(), 0)
+            if self.pressed_modifier_mask & bit:
+                self._toggle_modifier(bit, event)
+            if self._release_pressed(
+                self.compiled_bindings.key_bits, event.key()
+            ):
+                self._update_active_binding(event)
             self.key_released.emit(event.key())
             return False
 
-        # Is user pressing a shortcut mouse button?
-        if event_type == QtCore.QEvent.MouseButtonPress:
-            if self._can_press_button(event.button()):
-                self.shortcut_buttons_pressed[event.button()] = True
-                self.button_pressed.emit(event.button())
+        # Is user pressing a shortcut mouse or stylus button?
+        if event_type in BUTTON_PRESS_EVENT_TYPES:
+            bit = self.compiled_bindings.button_bits.get(event.button(), 0)
+            if bit and not self.pressed_mask & bit:
+                self._press(bit)
+                self.last_position = event.globalPos()
+                self.button_pressed.emit(
+                    event.button(), self.last_position, event.timestamp()
+                )
+                self._update_active_binding(event)
 
-        # User released shorcut mouse button
-        if event_type == QtCore.QEvent.MouseButtonRelease:
-            self._release_pressed(event.button())
+        # User released shorcut mouse or stylus button
+        if event_type in BUTTON_RELEASE_EVENT_TYPES:
+            self.last_position = event.globalPos()
+            if self._release_pressed(
+                self.compiled_bindings.button_bits, event.button()
+            ):
+                self._update_active_binding(event)
             self.button_released.emit(event.button())
             return False
 
-        # User is pressing all shortcut buttons and keys
+        # User is pressing all buttons and keys of a binding
         if self.is_shortcut_pressed:
             self.shortcut_pressed.emit(True)
-            if event_type == QtCore.QEvent.MouseMove:
-                self.shortcut_pressed_while_dragging.emit(True)
         return False
 
-    def _can_press_key(self, key):
-        """Confirm whether given key can be pressed."""
-        _, keys = text_input_to_buttons(self.shortcut)
-        return key in keys and not self.shortcut_keys_pressed[key]
+    def process_move(self, event):
+        """Handle a mouse or tablet move that was caught by the DragTracker.
+        The position of the event is passed on, so the cursor does not
+        have to be polled.
+        """
+        if self.recorder is not None:
+            self.recorder.record(event)
+
+        self.last_position = event.globalPos()
+
+        # User is dragging while pressing all buttons and keys of a binding
+        if not self.is_shortcut_pressed:
+            return
+        self.shortcut_pressed.emit(True)
+        self.shortcut_pressed_while_dragging.emit(
+            self.last_position, event.timestamp()
+        )
+
+    def _press(self, bit):
+        """Set the pressed bit of a key or button."""
+        # the first shortcut press starts the tracking of mouse moves
+        if not self.pressed_mask:
+            self.arm()
+        self.pressed_mask |= bit
+
+    def _toggle_modifier(self, bit, event):
+        """Flip the pressed bit of a modifier key, and let everyone know
+        when the whole modifier started or stopped being held down.
+        """
+        was_pressed = self.pressed_modifier_mask == self.modifier_mask
+        self.pressed_modifier_mask ^= bit
+        is_pressed = self.pressed_modifier_mask == self.modifier_mask
+        if is_pressed == was_pressed:
+            return
+        self.modifier_toggled.emit(
+            is_pressed, self.get_last_position(), event.timestamp()
+        )
+
+    def _release_pressed(self, bits, item):
+        """Clear the pressed bit of given key or button.
+        Returns whether the bit was set.
+        """
+        bit = bits.get(item)
+        if not bit or not self.pressed_mask & bit:
+            return False
+        self.pressed_mask &= ~bit
+        if not self.pressed_mask:
+            self.disarm()
+        return True
 
-    def _can_press_button(self, button):
-        """Confirm whether given button can be pressed."""
-        buttons, _ = text_input_to_buttons(self.shortcut)
-        return button in buttons and not self.shortcut_buttons_pressed[button]
+    def _update_active_binding(self, event):
+        """Look up the binding of the pressed chord, and let everyone
+        know when it differs from the active binding.
+        """
+        binding = self.compiled_bindings.chords.get(self.pressed_mask)
+        if binding == self.active_binding:
+            return
+
+        if self.active_binding is not None:
+            released = self.active_binding
+            self.active_binding = None
+            self.binding_released.emit(released)
 
-    def _release_pressed(self, item):
-        buttons, keys = text_input_to_buttons(self.shortcut)
-        if item in buttons:
-            self.shortcut_buttons_pressed[item] = False
-        if item in keys:
-            self.shortcut_keys_pressed[item] = False
+        if binding is None:
+            return
+        self.active_binding = binding
+        self.binding_pressed.emit(
+            binding, self.get_last_position(), event.timestamp()
+        )
+
+    def get_last_position(self):
+        """Get the global position of the latest event that had one.
+        Key events do not have a position, and before the first press or
+        move of a drag, the cursor is polled instead.
+        """
+        if self.last_position is None:
+            self.last_position = QtGui.QCursor.pos()
+        return self.last_position
 
     @property
     def is_shortcut_pressed(self):
-        """Confirm whether current set shortcut is being pressed."""
-        keys_pressed = [
-            self.shortcut_keys_pressed[key]
-            for key in self.shortcut_keys_pressed
-        ]
-        buttons_pressed = [
-            self.shortcut_buttons_pressed[button]
-            for button in self.shortcut_buttons_pressed
-        ]
-
-        return all(buttons_pressed + keys_pressed)
+        """Confirm whether all keys and buttons of a binding are pressed."""
+        return self.active_binding is not None
@@ -1,14 +1,24 @@
+import os
+import time
+
 from krita import Extension
 
-from ..drivers.shortcut_listener import ShortcutListener
+from PyQt5 import QtGui
+
+from ..drivers.shortcut_listener import ShortcutListener, DEFAULT_BINDING
 from ..drivers.brush_size_driver import BrushSizeDriver
+from ..drivers.brush_tool_tracker import BrushToolTracker
+from ..drivers.brush_parameter_drivers import PARAMETER_DRIVERS
+from ..drivers.driver_registry import DriverRegistry
+from ..drivers.pipeline import Sample, create_pipeline
+from ..drivers.event_recorder import EventRecorder, RECORDING_EXTENSION
 from ..ui.c_brush_resize_dock import (
     SINGAL_HANDLER,
-    DEFAULT_SHORTCUT,
-    SETTINGS_FILE,
+    SETTINGS_STORE,
+    DOCK_OBJECT_NAME,
 )
 from ..ui.c_brush_icon import CustomBrushIcon
-from ..utils import read_from_json
+from ..utils import get_recordings_folder
 
 
 class CustomBrushResizeExtension(Extension):
@@ -26,53 +36,154 @@ class CustomBrushResizeExtension(Extension):
             "c_brush_resize",
             "Custom Brush resize",
         )
+        self.c_brush_resize_record = window.createAction(
+            "c_brush_resize_record",
+            "Record Custom Brush Resize Input",
+        )
+        self.c_brush_resize_record.setCheckable(True)
+        self.c_brush_resize_record.toggled.connect(self.toggle_recording)
 
         # Initialize drivers
-        data = read_from_json(SETTINGS_FILE)
-        shortcut = data.get("shortcut", DEFAULT_SHORTCUT)
+        settings = SETTINGS_STORE.snapshot
+
+        self.shortcut_listener = ShortcutListener()
+        self.shortcut_listener.set_bindings(self.get_bindings(settings))
+        self.shortcut_listener.set_modifier(settings.fine_modifier)
+        self.shortcut_listener.install()
+
+        # one tracker of the brush tool button is shared by the drivers
+        self.brush_tool_tracker = BrushToolTracker(parent=self)
+
+        # every binding of the listener drags its own brush parameter
+        self.brush_driver = BrushSizeDriver(self.brush_tool_tracker)
+        self.driver_registry = DriverRegistry(self)
+        self.driver_registry.register(DEFAULT_BINDING, self.brush_driver)
+        for name, driver_class in PARAMETER_DRIVERS.items():
+            self.driver_registry.register(
+                name, driver_class(self.brush_tool_tracker)
+            )
 
-        self.shortcut_listener = ShortcutListener(shortcut)
-        self.brush_driver = BrushSizeDriver()
         self.brush_icon = CustomBrushIcon()
+        self.brush_icon.mode = settings.icon_mode
+        self.brush_icon.adaptive_quality = settings.adaptive_quality
         self.brush_icon.hide()
 
+        # every move goes through the pipeline to the active driver,
+        # which also coalesces and smooths the moves
+        self.pipeline = create_pipeline(settings, self.update_icon)
+
         # Connecting shorcut listener to other drivers
         # For whatever reason, I could not connect the drivers signals
         # and slots together directly. Instead, I had to define functions on
         # this extension class, and connect them instead.
 
         # press events
-        self.shortcut_listener.button_pressed.connect(self.start_resize)
+        self.shortcut_listener.binding_pressed.connect(self.start_resize)
         self.shortcut_listener.shortcut_pressed_while_dragging.connect(
             self.resize_brush
         )
+        self.shortcut_listener.modifier_toggled.connect(
+            self.set_fine_control
+        )
 
         # release events
-        self.shortcut_listener.button_released.connect(self.hide_icon)
-        self.shortcut_listener.key_released.connect(self.hide_icon)
-        self.shortcut_listener.button_released.connect(self.end_resize)
-        self.shortcut_listener.key_released.connect(self.end_resize)
+        # the drag ends first, as it may still update the icon
+        self.shortcut_listener.binding_released.connect(self.end_resize)
+        self.shortcut_listener.binding_released.connect(self.hide_icon)
 
         # This one can be connected directly?
         # setting changes
         SINGAL_HANDLER.shortcut_changed.connect(
             self.shortcut_listener.set_shortcut
         )
+        SETTINGS_STORE.snapshot_changed.connect(self.apply_settings)
+
+    def apply_settings(self, settings):
+        """Update the drivers with the given settings snapshot."""
+        self.shortcut_listener.set_bindings(self.get_bindings(settings))
+        self.shortcut_listener.set_modifier(settings.fine_modifier)
+        self.brush_icon.mode = settings.icon_mode
+        self.brush_icon.adaptive_quality = settings.adaptive_quality
+        # moves that the old pipeline held back still count
+        self.pipeline.flush()
+        self.pipeline = create_pipeline(settings, self.update_icon)
+        driver = self.driver_registry.active_driver
+        if driver is not None:
+            self.pipeline.start(
+                driver, Sample(QtGui.QCursor.pos(), driver.move_timestamp)
+            )
+
+    @staticmethod
+    def get_bindings(settings):
+        """Get the shortcut of every brush parameter from given settings.
+
+        :type settings: BrushSettings
+        :rtype: dict[str, str]
+        """
+        bindings = {DEFAULT_BINDING: settings.shortcut}
+        for name in PARAMETER_DRIVERS:
+            bindings[name] = getattr(settings, f"{name}_shortcut")
+        return bindings
+
+    def toggle_recording(self, record):
+        """Start or stop writing the listener's events to a new recording
+        in the recordings folder. See tests/replay_session.py for
+        replaying them.
+        """
+        if not record:
+            if self.shortcut_listener.recorder is not None:
+                self.shortcut_listener.recorder.stop()
+            self.shortcut_listener.recorder = None
+            return
+
+        file_name = time.strftime("session_%Y%m%d_%H%M%S")
+        recorder = EventRecorder(
+            os.path.join(
+                get_recordings_folder(DOCK_OBJECT_NAME),
+                file_name + RECORDING_EXTENSION,
+            )
+        )
+        recorder.start()
+        self.shortcut_listener.recorder = recorder
 
     def hide_icon(self, *_):
         self.brush_icon.hide()
+        self.brush_icon.end_drag()
 
-    def start_resize(self, *_):
-        self.brush_driver.start_resize()
-
-    def resize_brush(self, *_):
-        if not self.brush_driver.can_resize_brush:
+    def update_icon(self, driver):
+        if not driver.preview_icon:
             return
-        self.brush_icon.radius = (
-            self.brush_driver.brush_size_after_change * 0.5
-        )
-        self.brush_icon.show_at(self.brush_driver.initial_press_position)
-        self.brush_driver.resize_brush()
+        self.brush_icon.radius = driver.brush_size_after_change * 0.5
+        self.brush_icon.show_at(driver.initial_press_position)
+
+    def start_resize(self, binding, position, timestamp):
+        self.pipeline.flush()
+        self.driver_registry.start(binding, position, timestamp)
+        driver = self.driver_registry.active_driver
+        if driver is None:
+            return
+        self.pipeline.start(driver, Sample(position, timestamp))
+        if driver.can_resize_brush and driver.preview_icon:
+            self.brush_icon.begin_drag(
+                driver.initial_press_position, driver.max_brush_size * 0.5
+            )
+
+    def resize_brush(self, position, timestamp):
+        driver = self.driver_registry.active_driver
+        if driver is None or not driver.can_resize_brush:
+            return
+        self.pipeline.process(Sample(position, timestamp))
+
+    def set_fine_control(self, enabled, position, timestamp):
+        # the moves held back so far belong to the old anchor, and
+        # the drag is anchored again at the unfiltered position
+        self.pipeline.flush()
+        self.driver_registry.set_fine_control(enabled, position)
+        driver = self.driver_registry.active_driver
+        if driver is not None:
+            self.pipeline.start(driver, Sample(position, timestamp))
 
     def end_resize(self, *_):
-        self.brush_driver.end_resize()
+        # the last held back move still counts
+        self.pipeline.flush()
+        self.driver_registry.end()
@@ -0,0 +1,190 @@
+from PyQt5 import QtCore
+from PyQt5.QtCore import Qt
+
+from .ui.config import buttons_input_to_text
+
+
+DEFAULT_SHORTCUT = buttons_input_to_text(
+    [Qt.Key_Shift],
+    Qt.MouseButtons(Qt.RightButton),
+)
+DEFAULT_MAX_SIZE = 100
+DEFAULT_MAX_BRUSH_SIZE = 1000
+DEFAULT_MIN_BRUSH_SIZE = 0
+
+# Mouse moves are not coalesced by default
+DEFAULT_COALESCE_INTERVAL = 0
+
+# The view is only updated once the size changed by at least this much
+DEFAULT_MIN_SIZE_CHANGE = 1
+
+# When previewing, only the brush icon follows the drag and the view is
+# updated once the drag ends, or every catch up interval if it is set
+DEFAULT_PREVIEW_ONLY = False
+DEFAULT_CATCH_UP_INTERVAL = 0
+
+# The brush size follows the drag linearly by default, see
+# drivers.response_curve for the other curves
+DEFAULT_RESPONSE_CURVE = "linear"
+DEFAULT_CURVE_STRENGTH = 2.0
+DEFAULT_CURVE_POINTS = ((0.0, 0.0), (1.0, 1.0))
+
+# Dragging to the right makes the brush bigger by default, see
+# drivers.drag_geometry for the other directions
+DEFAULT_DRAG_MODE = "horizontal"
+DEFAULT_DRAG_ANGLE = 45
+
+# When sliding, dragging past the limits of the range moves the range
+# along, so dragging back changes the size straight away
+DEFAULT_SLIDE_RANGE = False
+
+# Moves are not smoothed by default, see drivers.pointer_filter
+DEFAULT_SMOOTHING = False
+DEFAULT_SMOOTHING_CUTOFF = 1.0
+DEFAULT_SMOOTHING_SPEED_FACTOR = 0.05
+DEFAULT_PREDICTION = 16
+
+# The brush icon keeps its size for the whole drag by default, see
+# ui.c_brush_icon for the other modes
+DEFAULT_ICON_MODE = "overlay"
+
+# When painting the brush icon is slow, it is painted with less quality
+# while the size changes, and in full quality once the drag pauses
+DEFAULT_ADAPTIVE_QUALITY = True
+
+# Every move of a drag goes through these stages of drivers.pipeline.
+# The map, quantize and apply stages can not be left out, the coalesce
+# and smooth stages are also left out while their own settings are off.
+DEFAULT_PIPELINE_STAGES = (
+    "coalesce",
+    "smooth",
+    "map",
+    "preview",
+    "quantize",
+    "dedupe",
+    "apply",
+)
+
+# When profiling, every stage of the pipeline is timed
+DEFAULT_PROFILE_PIPELINE = False
+
+# The fine shortcut resizes the brush over a drag range this many
+# times longer than the resize range
+DEFAULT_FINE_FACTOR = 4.0
+
+# Holding the fine modifier while dragging also makes the drag range
+# longer by the fine factor. It is off by default, as its keys must not
+# be part of any shortcut, and the suggested shortcuts use Ctrl
+DEFAULT_FINE_MODIFIER = ""
+
+# The shortcuts of the other brush parameters are disabled by default,
+# the dock suggests these until they are enabled
+DEFAULT_PARAMETER_SHORTCUT = ""
+SUGGESTED_PARAMETER_SHORTCUTS = {
+    "fine_shortcut": buttons_input_to_text(
+        [Qt.Key_Control, Qt.Key_Shift],
+        Qt.MouseButtons(Qt.RightButton),
+    ),
+    "opacity_shortcut": buttons_input_to_text(
+        [Qt.Key_Control],
+        Qt.MouseButtons(Qt.RightButton),
+    ),
+    "flow_shortcut": buttons_input_to_text(
+        [Qt.Key_Alt],
+        Qt.MouseButtons(Qt.RightButton),
+    ),
+    "rotation_shortcut": buttons_input_to_text(
+        [Qt.Key_Shift],
+        Qt.MouseButtons(Qt.MiddleButton),
+    ),
+}
+
+
+DEFAULT_SETTINGS = {
+    "max_size": DEFAULT_MAX_SIZE,
+    "max_brush_size": DEFAULT_MAX_BRUSH_SIZE,
+    "min_brush_size": DEFAULT_MIN_BRUSH_SIZE,
+    "shortcut": DEFAULT_SHORTCUT,
+    "coalesce_interval": DEFAULT_COALESCE_INTERVAL,
+    "min_size_change": DEFAULT_MIN_SIZE_CHANGE,
+    "preview_only": DEFAULT_PREVIEW_ONLY,
+    "catch_up_interval": DEFAULT_CATCH_UP_INTERVAL,
+    "response_curve": DEFAULT_RESPONSE_CURVE,
+    "curve_strength": DEFAULT_CURVE_STRENGTH,
+    "curve_points": DEFAULT_CURVE_POINTS,
+    "drag_mode": DEFAULT_DRAG_MODE,
+    "drag_angle": DEFAULT_DRAG_ANGLE,
+    "slide_range": DEFAULT_SLIDE_RANGE,
+    "smoothing": DEFAULT_SMOOTHING,
+    "smoothing_cutoff": DEFAULT_SMOOTHING_CUTOFF,
+    "smoothing_speed_factor": DEFAULT_SMOOTHING_SPEED_FACTOR,
+    "prediction": DEFAULT_PREDICTION,
+    "icon_mode": DEFAULT_ICON_MODE,
+    "adaptive_quality": DEFAULT_ADAPTIVE_QUALITY,
+    "pipeline_stages": DEFAULT_PIPELINE_STAGES,
+    "profile_pipeline": DEFAULT_PROFILE_PIPELINE,
+    "fine_factor": DEFAULT_FINE_FACTOR,
+    "fine_shortcut": DEFAULT_PARAMETER_SHORTCUT,
+    "fine_modifier": DEFAULT_FINE_MODIFIER,
+    "opacity_shortcut": DEFAULT_PARAMETER_SHORTCUT,
+    "flow_shortcut": DEFAULT_PARAMETER_SHORTCUT,
+    "rotation_shortcut": DEFAULT_PARAMETER_SHORTCUT,
+}
+
+
+def freeze(value):
+    """Turn lists, like the ones read from json, into tuples."""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class BrushSettings(object):
+    """An immutable snapshot of the custom brush resize settings.
+    Settings missing from the given values use DEFAULT_SETTINGS.
+    """
+
+    __slots__ = tuple(DEFAULT_SETTINGS)
+
+    def __init__(self, settings=None):
+        settings = settings or {}
+        for name in self.__slots__:
+            value = settings.get(name, DEFAULT_SETTINGS[name])
+            object.__setattr__(self, name, freeze(value))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} can not be changed")
+
+    def __eq__(self, other):
+        if not isinstance(other, BrushSettings):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __hash__(self):
+        return hash(tuple(self.as_dict().items()))
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class SettingsStore(QtCore.QObject):
+    """Keeps the current BrushSettings in memory.
+    The dock pushes its values into the store whenever they change,
+    so drivers can read the snapshot without searching for the dock.
+    """
+
+    snapshot_changed = QtCore.pyqtSignal(object)
+
+    def __init__(self, settings=None, parent=None):
+        super(SettingsStore, self).__init__(parent)
+        self.snapshot = BrushSettings(settings)
+
+    def update(self, settings):
+        """Replace the snapshot with given settings, and let everyone
+        know when any of them changed.
+        """
+        snapshot = BrushSettings(dict(self.snapshot.as_dict(), **settings))
+        if snapshot == self.snapshot:
+            return
+        self.snapshot = snapshot
+        self.snapshot_changed.emit(snapshot)
@@ -0,0 +1,206 @@
+"""Helpers shared by the headless benchmark scripts in this folder.
+
+The benchmarks are run directly with python, for example:
+    python python/custom_brush_resize/tests/shortcut_listener_benchmark.py
+They use the offscreen Qt platform, so no display is needed, and the
+krita stand-in in this folder instead of krita.
+"""
+
+import importlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+PACKAGE_NAME = "custom_brush_resize"
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.dirname(TESTS_DIR)
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+# keep the benchmarks away from the user's settings
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix=PACKAGE_NAME)
+
+_application = None
+
+
+def load_plugin():
+    """Import the plugin, which registers itself with the krita stand-in."""
+    for path in [TESTS_DIR, os.path.dirname(PACKAGE_DIR)]:
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    get_application()
+    return importlib.import_module(PACKAGE_NAME)
+
+
+def open_window(width=1920, height=1080):
+    """Open a krita window with a new document, so the plugin has
+    an active view to resize the brush of.
+    """
+    from krita import Krita
+
+    window = Krita.instance().openWindow()
+    document = Krita.instance().createDocument(width, height, "benchmark")
+    window.addView(document)
+    return window
+
+
+def get_extension():
+    """Get the plugin's extension that was added to krita."""
+    from krita import Krita
+
+    return Krita.instance().extensions()[0]
+
+
+def get_application():
+    """Get the running QApplication or create a new one."""
+    global _application
+    from PyQt5 import QtWidgets
+
+    if QtWidgets.QApplication.instance() is None:
+        # keep a reference, so the application is not garbage collected
+        _application = QtWidgets.QApplication([])
+    return QtWidgets.QApplication.instance()
+
+
+def time_per_call(func, iterations=100000):
+    """Get the average time in nanoseconds that calling func takes."""
+    # warm up so lazy initialization is not measured
+    for _ in range(min(iterations, 1000)):
+        func()
+
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def count_allocations(func, iterations=10000, file_path=None):
+    """Get the amount of memory blocks that are still allocated after
+    calling func. Only blocks allocated within file_path are counted
+    when it is given.
+    Blocks that func allocates and frees again are not counted,
+    see peak_allocation for those.
+    """
+    for _ in range(min(iterations, 1000)):
+        func()
+
+    filters = [tracemalloc.Filter(True, file_path)] if file_path else []
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot().filter_traces(filters)
+    for _ in range(iterations):
+        func()
+    after = tracemalloc.take_snapshot().filter_traces(filters)
+    tracemalloc.stop()
+
+    return sum(stat.count_diff for stat in after.compare_to(before, "lineno"))
+
+
+def peak_allocation(func, iterations=10000):
+    """Get the most bytes that a single call to func had allocated at
+    once, on top of what was allocated before the call. This includes
+    memory that is freed again before func returns.
+    """
+    for _ in range(min(iterations, 1000)):
+        func()
+
+    peak = 0
+    tracemalloc.start()
+    for _ in range(iterations):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, call_peak = tracemalloc.get_traced_memory()
+        peak = max(peak, call_peak - before)
+    tracemalloc.stop()
+    return peak
+
+
+def print_result(name, value, unit):
+    """Print a single benchmark result."""
+    print(f"{name:<48}{value:>12.1f} {unit}")
+
+
+def record_synthetic_session(
+    file_path, move_count=2000, rate=1000, jitter=1.5, shortcut="Right+Shift"
+):
+    """Write a recording of a single drag with given amount of moves,
+    as if made with a tablet reporting at rate Hz.
+    The stylus moves right and back again, with random jitter in pixels.
+    """
+    import math
+    import random
+
+    from PyQt5 import QtCore, QtGui
+
+    from custom_brush_resize.drivers.event_recorder import EventRecorder
+    from custom_brush_resize.ui.config import text_input_to_buttons
+
+    buttons, keys = text_input_to_buttons(shortcut)
+    randomizer = random.Random(0)
+    recorder = EventRecorder(file_path)
+    recorder.start()
+
+    def mouse_event(event_type, x, y, button, timestamp):
+        position = QtCore.QPointF(x, y)
+        event = QtGui.QMouseEvent(
+            event_type,
+            position,
+            position,
+            button,
+            button,
+            QtCore.Qt.NoModifier,
+        )
+        event.setTimestamp(timestamp)
+        return event
+
+    def key_event(event_type, key, timestamp):
+        event = QtGui.QKeyEvent(event_type, key, QtCore.Qt.NoModifier)
+        event.setTimestamp(timestamp)
+        return event
+
+    start_x, start_y = 500, 500
+    timestamp = 1000
+    for key in keys:
+        recorder.record(key_event(QtCore.QEvent.KeyPress, key, timestamp))
+    for button in buttons:
+        recorder.record(
+            mouse_event(
+                QtCore.QEvent.MouseButtonPress,
+                start_x,
+                start_y,
+                button,
+                timestamp,
+            )
+        )
+
+    for index in range(move_count):
+        phase = math.sin(math.pi * index / move_count)
+        x = start_x + 300 * phase + randomizer.uniform(-jitter, jitter)
+        y = start_y + randomizer.uniform(-jitter, jitter)
+        timestamp = 1000 + int(1000 * (index + 1) / rate)
+        recorder.record(
+            mouse_event(
+                QtCore.QEvent.MouseMove,
+                round(x),
+                round(y),
+                buttons[0] if buttons else QtCore.Qt.NoButton,
+                timestamp,
+            )
+        )
+
+    for button in buttons:
+        recorder.record(
+            mouse_event(
+                QtCore.QEvent.MouseButtonRelease,
+                start_x,
+                start_y,
+                button,
+                timestamp,
+            )
+        )
+    for key in keys:
+        recorder.record(key_event(QtCore.QEvent.KeyRelease, key, timestamp))
+    recorder.stop()
+    return file_path
@@ -0,0 +1,274 @@
+"""Time painting the CustomBrushIcon outline for a drag that grows and
+shrinks the brush, once drawn from scratch and once from the
+OutlineCache, and report the hits and misses of the cache.
+Then time every frame of the drag in each icon mode, including the
+repaint that it causes, and count how often the icon window is moved
+or resized. The offscreen platform has no window manager or compositor,
+so top-level windows are much cheaper here than on X11 or Wayland.
+Then a drag with a brush far bigger than the screen is timed, which
+only draws the arcs of the outline that are on screen.
+Last, a drag through radii that are not cached yet is timed with and
+without adaptive quality, with a paint time budget low enough for this
+machine to count as slow.
+"""
+
+import statistics
+import time
+
+import benchmark_utils
+
+benchmark_utils.load_plugin()
+app = benchmark_utils.get_application()
+
+from PyQt5 import QtGui, QtCore  # noqa: E402
+
+from custom_brush_resize.ui.c_brush_icon import (  # noqa: E402
+    CustomBrushIcon,
+    ICON_MODES,
+    ICON_WINDOW,
+    QUALITY_PAUSE_INTERVAL,
+)
+
+
+MIN_RADIUS = 20
+MAX_RADIUS = 250
+
+# half of the highest maximum brush size of the dock
+HUGE_RADIUS = 5000
+
+
+def drag_radii():
+    """Radii of a drag going up to MAX_RADIUS and back down twice."""
+    sweep = list(range(MIN_RADIUS, MAX_RADIUS))
+    return (sweep + sweep[::-1]) * 2
+
+
+class GeometryCounter(QtCore.QObject):
+    """Counts the move and resize events of the watched widget."""
+
+    def __init__(self, parent=None):
+        super(GeometryCounter, self).__init__(parent)
+        self.count = 0
+
+    def eventFilter(self, _, event):
+        if event.type() in (QtCore.QEvent.Move, QtCore.QEvent.Resize):
+            self.count += 1
+        return False
+
+
+# a paint time budget in nanoseconds that makes this machine slow
+SLOW_PAINT_TIME_BUDGET = 50000
+
+
+def uncached_radii():
+    """Radii of a drag through big outlines that still fit the screen."""
+    return list(range(300, 580))
+
+
+def huge_radii():
+    """Radii of a drag that grows a huge brush past the screen."""
+    return list(range(HUGE_RADIUS - 380, HUGE_RADIUS, 2))
+
+
+def drag(icon, radii, position, max_radius=MAX_RADIUS):
+    """Show the icon at each radius, like a drag does, and get the
+    nanoseconds that each frame took.
+    """
+    frame_times = []
+    icon.begin_drag(position, max_radius)
+    for radius in radii:
+        start = time.perf_counter_ns()
+        icon.radius = radius
+        icon.show_at(position)
+        app.processEvents()
+        frame_times.append(time.perf_counter_ns() - start)
+    icon.hide()
+    icon.end_drag()
+    return frame_times
+
+
+def run():
+    # the canvas mode needs a canvas on screen to draw in
+    window = benchmark_utils.open_window()
+    window.qwindow().resize(1280, 800)
+    window.qwindow().show()
+    canvas = window.activeView().canvas
+    position = canvas.mapToGlobal(canvas.rect().center())
+
+    icon = CustomBrushIcon()
+    radii = drag_radii()
+    target = QtGui.QImage(
+        MAX_RADIUS, MAX_RADIUS, QtGui.QImage.Format_ARGB32_Premultiplied
+    )
+    target.fill(QtCore.Qt.transparent)
+    device_pixel_ratio = icon.devicePixelRatioF()
+
+    def draw():
+        for radius in radii:
+            painter = QtGui.QPainter(target)
+            icon.render_outline(painter, radius)
+            painter.end()
+
+    def blit():
+        for radius in radii:
+            pixmap = icon.outline_cache.get(
+                radius, device_pixel_ratio, icon.outline_style
+            )
+            painter = QtGui.QPainter(target)
+            painter.drawPixmap(0, 0, pixmap)
+            painter.end()
+
+    draw_time = benchmark_utils.time_per_call(draw, 3)
+    icon.outline_cache.clear()
+    icon.outline_cache.reset_counters()
+    blit_time = benchmark_utils.time_per_call(blit, 3)
+
+    benchmark_utils.print_result(
+        "Drawn outline", draw_time / len(radii), "ns/paint"
+    )
+    benchmark_utils.print_result(
+        "Cached outline", blit_time / len(radii), "ns/paint"
+    )
+    benchmark_utils.print_result(
+        "Cache hits", icon.outline_cache.hits, "paints"
+    )
+    benchmark_utils.print_result(
+        "Cache misses", icon.outline_cache.misses, "paints"
+    )
+    benchmark_utils.print_result(
+        "Cached pixels", icon.outline_cache.pixels / 1e6, "megapixels"
+    )
+
+    counter = GeometryCounter()
+    icon.installEventFilter(counter)
+    for mode in ICON_MODES:
+        icon.mode = mode
+        # warm up the outline cache
+        drag(icon, radii, position)
+        counter.count = 0
+        frame_times = sorted(drag(icon, radii, position))
+        benchmark_utils.print_result(
+            f"Mean frame time ({mode})",
+            statistics.mean(frame_times) / 1000,
+            "us",
+        )
+        benchmark_utils.print_result(
+            f"95th percentile frame time ({mode})",
+            frame_times[int(len(frame_times) * 0.95)] / 1000,
+            "us",
+        )
+        benchmark_utils.print_result(
+            f"Geometry changes ({mode})",
+            counter.count / len(radii),
+            "events/step",
+        )
+
+    # the whole outline as one ellipse, clipped to the screen
+    screen = app.primaryScreen().geometry()
+    target = QtGui.QImage(
+        screen.size(), QtGui.QImage.Format_ARGB32_Premultiplied
+    )
+    # the centre is off screen, so only the left edge of the outline
+    # crosses the screen
+    huge_position = QtCore.QPoint(
+        screen.left() + HUGE_RADIUS // 2 + 200, screen.center().y()
+    )
+    outline = QtCore.QRect(0, 0, HUGE_RADIUS, HUGE_RADIUS)
+    outline.moveCenter(huge_position)
+
+    def draw_ellipse():
+        painter = QtGui.QPainter(target)
+        painter.setRenderHints(QtGui.QPainter.HighQualityAntialiasing)
+        painter.drawEllipse(outline)
+        painter.end()
+
+    def draw_arcs():
+        painter = QtGui.QPainter(target)
+        icon.render_visible_arcs(painter, outline)
+        painter.end()
+
+    benchmark_utils.print_result(
+        "Huge outline as an ellipse",
+        benchmark_utils.time_per_call(draw_ellipse, 100) / 1000,
+        "us",
+    )
+    benchmark_utils.print_result(
+        "Huge outline as visible arcs",
+        benchmark_utils.time_per_call(draw_arcs, 100) / 1000,
+        "us",
+    )
+
+    benchmark_utils.print_result(
+        "Huge icon size without clipping", HUGE_RADIUS ** 2 / 1e6, "megapixels"
+    )
+
+    radii = huge_radii()
+    for mode in ICON_MODES:
+        icon.mode = mode
+        frame_times = drag(icon, radii, huge_position, HUGE_RADIUS)
+        icon.radius = HUGE_RADIUS
+        icon.show_at(huge_position)
+        pixels = icon.width() * icon.height()
+        icon.hide()
+        benchmark_utils.print_result(
+            f"Huge mean frame time ({mode})",
+            statistics.mean(frame_times) / 1000,
+            "us",
+        )
+        benchmark_utils.print_result(
+            f"Huge icon size ({mode})", pixels / 1e6, "megapixels"
+        )
+
+    compare_adaptive_quality(icon, position)
+
+
+def compare_adaptive_quality(icon, position):
+    """Time a drag through uncached radii with and without adaptive
+    quality, and check that the outline is painted in high quality
+    once the drag pauses.
+    """
+    icon.mode = ICON_WINDOW
+    icon.paint_time_budget = SLOW_PAINT_TIME_BUDGET
+    radii = uncached_radii()
+    for adaptive_quality in (False, True):
+        icon.adaptive_quality = adaptive_quality
+        icon.paint_time = 0
+        icon.high_quality_paints = 0
+        icon.fast_paints = 0
+        icon.outline_cache.clear()
+
+        # keep the icon up after the drag, to see it paused
+        icon.begin_drag(position, radii[-1])
+        frame_times = []
+        for radius in radii:
+            start = time.perf_counter_ns()
+            icon.radius = radius
+            icon.show_at(position)
+            app.processEvents()
+            frame_times.append(time.perf_counter_ns() - start)
+        paused = time.perf_counter() + QUALITY_PAUSE_INTERVAL / 500.0
+        while time.perf_counter() < paused:
+            app.processEvents()
+        assert icon.high_quality
+        icon.hide()
+        icon.end_drag()
+
+        name = "adaptive" if adaptive_quality else "high quality"
+        benchmark_utils.print_result(
+            f"Uncached mean frame time ({name})",
+            statistics.mean(frame_times) / 1000,
+            "us",
+        )
+        benchmark_utils.print_result(
+            f"High quality paints ({name})",
+            icon.high_quality_paints,
+            "paints",
+        )
+        benchmark_utils.print_result(
+            f"Fast paints ({name})", icon.fast_paints, "paints"
+        )
+    icon.adaptive_quality = False
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,86 @@
+"""Time a single move through the BrushSizeDriver and through the whole
+pipeline, without drawing the brush icon, for every drag mode.
+The geometry of a drag is computed once when it starts, so every mode
+should cost about the same per move.
+"""
+
+import math
+
+import benchmark_utils
+
+benchmark_utils.load_plugin()
+app = benchmark_utils.get_application()
+
+from PyQt5 import QtCore  # noqa: E402
+
+from custom_brush_resize.drivers.drag_geometry import (  # noqa: E402
+    DRAG_MODES,
+)
+from custom_brush_resize.drivers.pipeline import (  # noqa: E402
+    Sample,
+    create_pipeline,
+)
+from custom_brush_resize.ui.c_brush_resize_dock import (  # noqa: E402
+    SETTINGS_STORE,
+)
+
+
+PRESS_POSITION = QtCore.QPoint(960, 540)
+MOVE_COUNT = 400
+
+
+def circle_positions():
+    """Positions going around the press position, getting further away."""
+    positions = []
+    for i in range(MOVE_COUNT):
+        angle = i * 0.1
+        distance = i * 0.25
+        positions.append(
+            QtCore.QPoint(
+                PRESS_POSITION.x() + int(math.cos(angle) * distance),
+                PRESS_POSITION.y() + int(math.sin(angle) * distance),
+            )
+        )
+    return positions
+
+
+def run():
+    benchmark_utils.open_window()
+    driver = benchmark_utils.get_extension().brush_driver
+    positions = circle_positions()
+
+    for mode in DRAG_MODES:
+        SETTINGS_STORE.update({"drag_mode": mode, "drag_angle": 30})
+        pipeline = create_pipeline(SETTINGS_STORE.snapshot, lambda _: None)
+        driver.start_resize(PRESS_POSITION, 0)
+        pipeline.start(driver, Sample(PRESS_POSITION, 0))
+
+        # pressing does not change the brush size in any mode
+        size = driver.calculate_new_brush_size(PRESS_POSITION)
+        assert abs(size - driver.brush_size) < 1, mode
+
+        def calculate():
+            for position in positions:
+                driver.calculate_new_brush_size(position)
+
+        def resize():
+            for position in positions:
+                pipeline.process(Sample(position, 0))
+
+        calculate_time = benchmark_utils.time_per_call(calculate, 1000)
+        resize_time = benchmark_utils.time_per_call(resize, 100)
+        pipeline.flush()
+        driver.end_resize()
+
+        benchmark_utils.print_result(
+            f"calculate_new_brush_size ({mode})",
+            calculate_time / MOVE_COUNT,
+            "ns/move",
+        )
+        benchmark_utils.print_result(
+            f"pipeline ({mode})", resize_time / MOVE_COUNT, "ns/move"
+        )
+
+
+if __name__ == "__main__":
+    run()
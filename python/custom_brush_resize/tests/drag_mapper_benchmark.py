@@ -0,0 +1,95 @@
+"""Compare mapping a drag position to a brush size with the precomputed
+LinearDragMapper against computing the range with remap and clamp on
+every move, which is what BrushSizeDriver used to do.
+The CurveDragMapper of each non-linear response curve is timed as well.
+"""
+
+import benchmark_utils
+
+benchmark_utils.load_plugin()
+
+from custom_brush_resize.drivers.drag_mapper import (  # noqa: E402
+    LinearDragMapper,
+)
+from custom_brush_resize.drivers.response_curve import (  # noqa: E402
+    ResponseCurve,
+    RESPONSE_CURVES,
+)
+from custom_brush_resize.utils import remap, clamp  # noqa: E402
+
+
+PRESS_X = 500
+BRUSH_SIZE = 40
+MIN_BRUSH_SIZE = 0
+MAX_BRUSH_SIZE = 1000
+RESIZE_MAX = 100
+
+
+def get_starting_x_pos():
+    remapped_brush_size = remap(
+        BRUSH_SIZE,
+        (MIN_BRUSH_SIZE, MAX_BRUSH_SIZE),
+        (PRESS_X, PRESS_X + RESIZE_MAX),
+    )
+    return PRESS_X - abs(PRESS_X - remapped_brush_size)
+
+
+def remap_brush_size(x):
+    start_x = get_starting_x_pos()
+    new_brush_size = remap(
+        x,
+        (start_x, start_x + RESIZE_MAX),
+        (MIN_BRUSH_SIZE, MAX_BRUSH_SIZE),
+    )
+    return clamp(MIN_BRUSH_SIZE, new_brush_size, MAX_BRUSH_SIZE)
+
+
+def run():
+    mapper = LinearDragMapper(
+        get_starting_x_pos(), RESIZE_MAX, MIN_BRUSH_SIZE, MAX_BRUSH_SIZE
+    )
+    positions = range(PRESS_X - 200, PRESS_X + 200)
+
+    for x in positions:
+        assert abs(mapper.map(x) - remap_brush_size(x)) < 1e-9, x
+
+    def map_remap():
+        for x in positions:
+            remap_brush_size(x)
+
+    def map_mapper():
+        for x in positions:
+            mapper.map(x)
+
+    remap_time = benchmark_utils.time_per_call(map_remap, 1000)
+    mapper_time = benchmark_utils.time_per_call(map_mapper, 1000)
+    benchmark_utils.print_result(
+        "remap and clamp", remap_time / len(positions), "ns/move"
+    )
+    benchmark_utils.print_result(
+        "LinearDragMapper", mapper_time / len(positions), "ns/move"
+    )
+    benchmark_utils.print_result("Speed up", remap_time / mapper_time, "x")
+
+    points = ((0.25, 0.05), (0.75, 0.5))
+    for name in RESPONSE_CURVES[1:]:
+        curve = ResponseCurve(
+            name, 2.0, points, MIN_BRUSH_SIZE, MAX_BRUSH_SIZE
+        )
+        curve_mapper = curve.create_mapper(PRESS_X, BRUSH_SIZE, RESIZE_MAX)
+        # the press position keeps the current brush size, within
+        # the distance between two sizes of the lookup table
+        assert abs(curve_mapper.map(PRESS_X) - BRUSH_SIZE) < 2, name
+
+        def map_curve():
+            for x in positions:
+                curve_mapper.map(x)
+
+        curve_time = benchmark_utils.time_per_call(map_curve, 1000)
+        benchmark_utils.print_result(
+            f"CurveDragMapper ({name})", curve_time / len(positions), "ns/move"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,336 @@
+"""A stand-in for the parts of the krita python api that the plugin uses.
+This allows the whole plugin to be loaded outside of krita, for example
+under the offscreen Qt platform for benchmarks:
+
+    QT_QPA_PLATFORM=offscreen python some_benchmark.py
+
+Objects record the calls made to them, together with a timestamp in
+nanoseconds, so benchmarks can check what the plugin did and when.
+https://api.kde.org/krita/html/classKrita.html
+"""
+
+import builtins
+import time
+
+from PyQt5 import QtCore, QtWidgets
+
+
+TOOL_BOX_NAME = "ToolBox"
+BRUSH_TOOL_NAME = "KritaShape/KisToolBrush"
+TOOL_NAMES = [
+    BRUSH_TOOL_NAME,
+    "KritaSelected/KisToolMove",
+    "KritaShape/KisToolLine",
+]
+
+
+def i18n(text):
+    """Krita adds i18n to the builtins of every plugin."""
+    return text
+
+
+if not hasattr(builtins, "i18n"):
+    builtins.i18n = i18n
+
+
+class CallRecorder(object):
+    """Keeps a list of (name, arguments, timestamp) for each recorded call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def record(self, name, *args):
+        self.calls.append((name, args, time.perf_counter_ns()))
+
+    def calls_to(self, name):
+        """Get the recorded calls to the method with given name."""
+        return [call for call in self.calls if call[0] == name]
+
+
+class DockWidgetFactoryBase(object):
+    DockTornOff = 0
+    DockTop = 1
+    DockBottom = 2
+    DockRight = 3
+    DockLeft = 4
+    DockMinimized = 5
+
+
+class DockWidgetFactory(DockWidgetFactoryBase):
+    def __init__(self, _id, dock_position, klass):
+        self._id = _id
+        self.dock_position = dock_position
+        self.klass = klass
+
+    def id(self):
+        return self._id
+
+    def create(self):
+        dock = self.klass()
+        dock.setObjectName(self._id)
+        return dock
+
+
+class DockWidget(QtWidgets.QDockWidget):
+    def __init__(self):
+        super(DockWidget, self).__init__()
+        self._canvas = None
+
+    def canvas(self):
+        return self._canvas
+
+    def canvasChanged(self, canvas):
+        pass
+
+
+class Extension(QtCore.QObject):
+    def __init__(self, parent=None):
+        super(Extension, self).__init__(parent)
+
+    def setup(self):
+        pass
+
+    def createActions(self, window):
+        pass
+
+
+class Document(CallRecorder):
+    def __init__(self, width, height, name):
+        super(Document, self).__init__()
+        self._width = width
+        self._height = height
+        self._name = name
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+    def name(self):
+        return self._name
+
+
+class KisQPainterCanvas(QtWidgets.QWidget):
+    """Stands in for the canvas widget of a view, which krita finds
+    by its class name. It fills itself like a blank canvas.
+    """
+
+    def __init__(self, parent=None):
+        super(KisQPainterCanvas, self).__init__(parent)
+        self.setAutoFillBackground(True)
+        self.setMinimumSize(640, 480)
+
+
+class View(CallRecorder):
+    """Keeps the brush settings in memory.
+    set_cost can be used to make a setter take a given amount of seconds,
+    to imitate brush presets that are slow to update.
+    """
+
+    def __init__(self, window, document):
+        super(View, self).__init__()
+        self._window = window
+        self._document = document
+        self._brush_size = 40.0
+        self._opacity = 1.0
+        self._flow = 1.0
+        self._rotation = 0.0
+        self.costs = {}
+
+        # every view is shown in a sub window of the mdi area
+        self.canvas = KisQPainterCanvas()
+        mdi_area = window.qwindow().centralWidget()
+        self.sub_window = mdi_area.addSubWindow(self.canvas)
+        self.sub_window.show()
+        mdi_area.setActiveSubWindow(self.sub_window)
+
+    def set_cost(self, name, seconds):
+        self.costs[name] = seconds
+
+    def _spend(self, name):
+        cost = self.costs.get(name)
+        if not cost:
+            return
+        end = time.perf_counter() + cost
+        while time.perf_counter() < end:
+            pass
+
+    def window(self):
+        return self._window
+
+    def document(self):
+        return self._document
+
+    def visible(self):
+        return self._window.activeView() is self
+
+    def brushSize(self):
+        self.record("brushSize")
+        return self._brush_size
+
+    def setBrushSize(self, value):
+        self.record("setBrushSize", value)
+        self._spend("setBrushSize")
+        self._brush_size = float(value)
+
+    def paintingOpacity(self):
+        self.record("paintingOpacity")
+        return self._opacity
+
+    def setPaintingOpacity(self, value):
+        self.record("setPaintingOpacity", value)
+        self._spend("setPaintingOpacity")
+        self._opacity = float(value)
+
+    def paintingFlow(self):
+        self.record("paintingFlow")
+        return self._flow
+
+    def setPaintingFlow(self, value):
+        self.record("setPaintingFlow", value)
+        self._spend("setPaintingFlow")
+        self._flow = float(value)
+
+    def brushRotation(self):
+        self.record("brushRotation")
+        return self._rotation
+
+    def setBrushRotation(self, value):
+        self.record("setBrushRotation", value)
+        self._spend("setBrushRotation")
+        self._rotation = float(value)
+
+
+class Window(CallRecorder):
+    def __init__(self):
+        super(Window, self).__init__()
+        self._qwindow = QtWidgets.QMainWindow()
+        self._qwindow.setCentralWidget(QtWidgets.QMdiArea())
+        self._views = []
+        self._active_view = None
+        self.actions = {}
+        self.tool_buttons = {}
+        self._create_tool_box()
+
+    def _create_tool_box(self):
+        dock = QtWidgets.QDockWidget()
+        dock.setObjectName(TOOL_BOX_NAME)
+        widget = QtWidgets.QWidget()
+        layout = QtWidgets.QVBoxLayout(widget)
+        group = QtWidgets.QButtonGroup(widget)
+        for name in TOOL_NAMES:
+            button = QtWidgets.QToolButton()
+            button.setObjectName(name)
+            button.setCheckable(True)
+            group.addButton(button)
+            layout.addWidget(button)
+            self.tool_buttons[name] = button
+        dock.setWidget(widget)
+        self._qwindow.addDockWidget(QtCore.Qt.LeftDockWidgetArea, dock)
+        self.activate_tool(BRUSH_TOOL_NAME)
+
+    def activate_tool(self, name):
+        """Check the tool box button of the tool with given name."""
+        self.tool_buttons[name].setChecked(True)
+
+    def qwindow(self):
+        return self._qwindow
+
+    def views(self):
+        return list(self._views)
+
+    def activeView(self):
+        return self._active_view
+
+    def addView(self, document):
+        self.record("addView", document)
+        view = View(self, document)
+        self._views.append(view)
+        self._active_view = view
+        return view
+
+    def createAction(self, _id, text="", menu_location="tools/scripts"):
+        self.record("createAction", _id, text, menu_location)
+        action = QtWidgets.QAction(text, self._qwindow)
+        action.setObjectName(_id)
+        self.actions[_id] = action
+        return action
+
+
+class Krita(QtCore.QObject, CallRecorder):
+    windowCreated = QtCore.pyqtSignal()
+
+    _instance = None
+
+    def __init__(self):
+        QtCore.QObject.__init__(self)
+        CallRecorder.__init__(self)
+        self._extensions = []
+        self._dock_widget_factories = []
+        self._windows = []
+        self._documents = []
+        self._active_window = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def addExtension(self, extension):
+        self.record("addExtension", extension)
+        self._extensions.append(extension)
+        extension.setup()
+
+    def extensions(self):
+        return list(self._extensions)
+
+    def addDockWidgetFactory(self, factory):
+        self.record("addDockWidgetFactory", factory)
+        self._dock_widget_factories.append(factory)
+
+    def openWindow(self):
+        """Create a window with every registered dock widget, and let
+        the extensions create their actions for it.
+        """
+        self.record("openWindow")
+        window = Window()
+        for factory in self._dock_widget_factories:
+            window.qwindow().addDockWidget(
+                QtCore.Qt.RightDockWidgetArea, factory.create()
+            )
+        self._windows.append(window)
+        self._active_window = window
+        for extension in self._extensions:
+            extension.createActions(window)
+        self.windowCreated.emit()
+        return window
+
+    def windows(self):
+        return list(self._windows)
+
+    def activeWindow(self):
+        return self._active_window
+
+    def createDocument(self, width, height, name, *_):
+        self.record("createDocument", width, height, name)
+        document = Document(width, height, name)
+        self._documents.append(document)
+        return document
+
+    def documents(self):
+        return list(self._documents)
+
+    def activeDocument(self):
+        view = self._active_window and self._active_window.activeView()
+        if view is None:
+            return None
+        return view.document()
+
+    def dockers(self):
+        if self._active_window is None:
+            return []
+        return self._active_window.qwindow().findChildren(
+            QtWidgets.QDockWidget
+        )
@@ -0,0 +1,142 @@
+"""Replay a recording without smoothing, with the OneEuroFilter and with
+the OneEuroFilter predicting a frame ahead, and compare how often the
+brush size is updated and how often it changes direction.
+
+    python python/custom_brush_resize/tests/pointer_filter_benchmark.py
+
+Without a recording, a synthetic drag session with jitter is replayed.
+"""
+
+import bisect
+import os
+import statistics
+import sys
+
+import benchmark_utils
+import replay_session
+
+from PyQt5 import QtCore  # noqa: E402
+
+from custom_brush_resize.drivers.event_recorder import (  # noqa: E402
+    read_recording,
+)
+from custom_brush_resize.drivers.pointer_filter import (  # noqa: E402
+    OneEuroFilter,
+)
+from custom_brush_resize.ui.c_brush_resize_dock import (  # noqa: E402
+    SETTINGS_STORE,
+)
+
+
+# milliseconds between two frames at 60Hz
+FRAME = 16
+
+CONFIGURATIONS = [
+    ("No smoothing", {"smoothing": False, "prediction": 0}),
+    ("OneEuroFilter", {"smoothing": True, "prediction": 0}),
+    (
+        "OneEuroFilter, a frame of prediction",
+        {"smoothing": True, "prediction": FRAME},
+    ),
+]
+
+
+def count_reversals(sizes):
+    """Count how often consecutive size updates change direction."""
+    reversals = 0
+    direction = 0
+    for previous, size in zip(sizes, sizes[1:]):
+        new_direction = (size > previous) - (size < previous)
+        if new_direction and direction and new_direction != direction:
+            reversals += 1
+        direction = new_direction or direction
+    return reversals
+
+
+def moves_of(records):
+    """Get the global position and timestamp of every recorded move."""
+    move_types = (
+        int(QtCore.QEvent.MouseMove),
+        int(QtCore.QEvent.TabletMove),
+    )
+    return [
+        (QtCore.QPoint(x, y), timestamp)
+        for event_type, _, x, y, timestamp in records
+        if event_type in move_types
+    ]
+
+
+def frame_offset(moves, settings):
+    """Get the mean distance in pixels between each position given to the
+    driver and the recorded position a frame later, which is about where
+    the stylus is by the time the new size is on screen.
+    """
+    pointer_filter = OneEuroFilter(
+        SETTINGS_STORE.snapshot.smoothing_cutoff,
+        SETTINGS_STORE.snapshot.smoothing_speed_factor,
+        settings["prediction"],
+    )
+    timestamps = [timestamp for _, timestamp in moves]
+    offsets = []
+    for position, timestamp in moves:
+        if settings["smoothing"]:
+            position = pointer_filter.filter(position, timestamp)
+        index = bisect.bisect_left(timestamps, timestamp + FRAME)
+        target = moves[min(index, len(moves) - 1)][0]
+        offsets.append((position - target).manhattanLength())
+    return statistics.mean(offsets or [0])
+
+
+def run(recording=None):
+    window = benchmark_utils.open_window()
+    view = window.activeView()
+    extension = benchmark_utils.get_extension()
+
+    recording = recording or benchmark_utils.record_synthetic_session(
+        os.path.join(os.environ["APPDATA"], "synthetic.cbrr")
+    )
+    records = read_recording(recording)
+    moves = moves_of(records)
+
+    for name, settings in CONFIGURATIONS:
+        SETTINGS_STORE.update(settings)
+        view.setBrushSize(40)
+        view.calls = []
+        extension.shortcut_listener.install()
+        results = replay_session.replay(records, extension)
+        sizes = [call[1][0] for call in view.calls_to("setBrushSize")]
+
+        print(name)
+        benchmark_utils.print_result(
+            "  Applied view updates", results.applied_updates, "updates"
+        )
+        benchmark_utils.print_result(
+            "  Direction changes", count_reversals(sizes), "updates"
+        )
+        benchmark_utils.print_result(
+            "  Mean latency",
+            statistics.mean(results.latencies or [0]) / 1000,
+            "us",
+        )
+        benchmark_utils.print_result(
+            "  Mean offset a frame later",
+            frame_offset(moves, settings),
+            "px",
+        )
+
+    pointer_filter = OneEuroFilter(prediction=FRAME)
+    pointer_filter.reset(moves[0][0], moves[0][1])
+
+    def filter_moves():
+        for position, timestamp in moves:
+            pointer_filter.filter(position, timestamp)
+
+    benchmark_utils.print_result(
+        "OneEuroFilter.filter",
+        benchmark_utils.time_per_call(filter_moves, 100) / len(moves),
+        "ns/move",
+    )
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else None)
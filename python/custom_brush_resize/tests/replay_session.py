@@ -0,0 +1,176 @@
+"""Replay a recording made with the `Record Custom Brush Resize Input`
+action through the ShortcutListener, BrushSizeDriver and CustomBrushIcon,
+and report the resize latency and throughput.
+
+    python python/custom_brush_resize/tests/replay_session.py session.cbrr
+
+Without a recording, a synthetic drag session is replayed.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+import benchmark_utils
+
+benchmark_utils.load_plugin()
+app = benchmark_utils.get_application()
+
+from PyQt5 import QtWidgets  # noqa: E402
+
+from custom_brush_resize.drivers.event_recorder import (  # noqa: E402
+    read_recording,
+    create_event,
+)
+from custom_brush_resize.ui.c_brush_resize_dock import (  # noqa: E402
+    SETTINGS_STORE,
+)
+
+
+class ReplayResults(object):
+    """Timings collected while replaying a recording."""
+
+    def __init__(self):
+        self.latencies = []
+        self.resize_count = 0
+        self.applied_updates = 0
+        self.suppressed_updates = 0
+        self.duration = 0.0
+        # name, calls, dropped samples and nanoseconds of every stage
+        # of the pipeline, while it is profiled
+        self.stages = []
+
+    def count_resize(self, *_):
+        self.resize_count += 1
+
+    def report(self):
+        """Print the collected timings."""
+        latencies = sorted(self.latencies) or [0]
+        benchmark_utils.print_result("Events", len(self.latencies), "events")
+        benchmark_utils.print_result("Resizes", self.resize_count, "resizes")
+        benchmark_utils.print_result(
+            "Applied view updates", self.applied_updates, "updates"
+        )
+        benchmark_utils.print_result(
+            "Suppressed view updates", self.suppressed_updates, "updates"
+        )
+        benchmark_utils.print_result(
+            "Mean latency", statistics.mean(latencies) / 1000, "us"
+        )
+        benchmark_utils.print_result(
+            "95th percentile latency",
+            latencies[int(len(latencies) * 0.95)] / 1000,
+            "us",
+        )
+        benchmark_utils.print_result(
+            "Max latency", latencies[-1] / 1000, "us"
+        )
+        if self.duration:
+            benchmark_utils.print_result(
+                "Throughput", len(self.latencies) / self.duration, "events/s"
+            )
+            benchmark_utils.print_result(
+                "Resize rate", self.resize_count / self.duration, "resizes/s"
+            )
+        for name, calls, dropped, elapsed in self.stages:
+            benchmark_utils.print_result(
+                f"Stage {name}", elapsed / max(calls, 1), "ns/sample"
+            )
+            benchmark_utils.print_result(
+                f"Stage {name} dropped", dropped, "samples"
+            )
+
+
+def replay(records, extension, realtime=False):
+    """Send the recorded events through the application, so they
+    reach the installed ShortcutListener.
+    When realtime is set, the recorded time between events is kept.
+    """
+    results = ReplayResults()
+    extension.brush_driver.brush_size_changed.connect(results.count_resize)
+    extension.brush_driver.reset_update_counters()
+    extension.pipeline.reset_counters()
+
+    target = QtWidgets.QWidget()
+    first_timestamp = records[0][4] if records else 0
+    start = time.perf_counter()
+
+    for record in records:
+        if realtime:
+            due = start + (record[4] - first_timestamp) / 1000.0
+            while time.perf_counter() < due:
+                app.processEvents()
+
+        event = create_event(record)
+        sent = time.perf_counter_ns()
+        QtWidgets.QApplication.sendEvent(target, event)
+        app.processEvents()
+        results.latencies.append(time.perf_counter_ns() - sent)
+
+    results.duration = time.perf_counter() - start
+    results.applied_updates = extension.brush_driver.applied_updates
+    results.suppressed_updates = extension.brush_driver.suppressed_updates
+    if extension.pipeline.profile:
+        results.stages = [
+            (stage.name, stage.calls, stage.dropped, stage.elapsed)
+            for stage in extension.pipeline.stages
+        ]
+    extension.shortcut_listener.uninstall()
+    return results
+
+
+def parse_settings(overrides):
+    """Turn NAME=VALUE strings into a settings dictionary."""
+    settings = {}
+    for override in overrides:
+        name, _, value = override.partition("=")
+        try:
+            settings[name] = json.loads(value)
+        except ValueError:
+            settings[name] = value
+    return settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "recording", nargs="?", help="the .cbrr file to replay"
+    )
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="keep the recorded time between events",
+    )
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="override a setting, for example --set coalesce_interval=16",
+    )
+    parser.add_argument(
+        "--brush-cost",
+        type=float,
+        default=0.0,
+        help="milliseconds that each setBrushSize call takes",
+    )
+    args = parser.parse_args()
+
+    window = benchmark_utils.open_window()
+    window.activeView().set_cost("setBrushSize", args.brush_cost / 1000)
+    extension = benchmark_utils.get_extension()
+    SETTINGS_STORE.update(parse_settings(args.set))
+
+    recording = args.recording or benchmark_utils.record_synthetic_session(
+        os.path.join(os.environ["APPDATA"], "synthetic.cbrr")
+    )
+    results = replay(
+        read_recording(recording), extension, realtime=args.realtime
+    )
+    results.report()
+
+
+if __name__ == "__main__":
+    main()
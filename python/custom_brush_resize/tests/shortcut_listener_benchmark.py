@@ -0,0 +1,218 @@
+"""Benchmark the two stages of the ShortcutListener.
+While the shortcut is released only the cheap press/release stage runs.
+Once the shortcut is held down, checking whether it is pressed is a
+single integer comparison that allocates nothing. A whole MouseMove
+reaching the DragTracker is not allocation free: the position of the
+move and the arguments of the signal that carries it are allocated and
+freed again on every move. It should not leave any allocations behind,
+besides the position of the latest move.
+Adding bindings should not make any of it slower, as the pressed binding
+is found with one lookup on the pressed keys and buttons.
+"""
+
+import benchmark_utils
+
+benchmark_utils.load_plugin()
+app = benchmark_utils.get_application()
+
+from PyQt5 import QtCore, QtGui, QtWidgets  # noqa: E402
+
+from custom_brush_resize.drivers import shortcut_listener  # noqa: E402
+from custom_brush_resize.ui.config import buttons_input_to_text  # noqa: E402
+
+
+def mouse_event(event_type, button=QtCore.Qt.NoButton):
+    position = QtCore.QPointF(10, 10)
+    return QtGui.QMouseEvent(
+        event_type,
+        position,
+        position,
+        button,
+        button,
+        QtCore.Qt.NoModifier,
+    )
+
+
+def key_event(event_type, key):
+    return QtGui.QKeyEvent(event_type, key, QtCore.Qt.NoModifier)
+
+
+def press_shortcut(listener):
+    listener.eventFilter(
+        None, key_event(QtCore.QEvent.KeyPress, QtCore.Qt.Key_Shift)
+    )
+    listener.eventFilter(
+        None,
+        mouse_event(QtCore.QEvent.MouseButtonPress, QtCore.Qt.RightButton),
+    )
+    assert listener.is_shortcut_pressed
+
+
+def release_shortcut(listener):
+    listener.eventFilter(
+        None,
+        mouse_event(QtCore.QEvent.MouseButtonRelease, QtCore.Qt.RightButton),
+    )
+    listener.eventFilter(
+        None, key_event(QtCore.QEvent.KeyRelease, QtCore.Qt.Key_Shift)
+    )
+    assert not listener.drag_tracker.armed
+
+
+def benchmark_filters():
+    """Time the event filters when they are called directly."""
+    listener = shortcut_listener.ShortcutListener("Right+Shift")
+    move = mouse_event(QtCore.QEvent.MouseMove)
+    key = key_event(QtCore.QEvent.KeyPress, QtCore.Qt.Key_A)
+
+    def filter_move():
+        listener.eventFilter(None, move)
+
+    def filter_key():
+        listener.eventFilter(None, key)
+
+    def track_move():
+        listener.drag_tracker.eventFilter(None, move)
+
+    benchmark_utils.print_result(
+        "Stage 1, MouseMove",
+        benchmark_utils.time_per_call(filter_move),
+        "ns/event",
+    )
+    benchmark_utils.print_result(
+        "Stage 1, KeyPress outside of shortcut",
+        benchmark_utils.time_per_call(filter_key),
+        "ns/event",
+    )
+
+    press_shortcut(listener)
+    benchmark_utils.print_result(
+        "Stage 2, MouseMove, shortcut pressed",
+        benchmark_utils.time_per_call(track_move),
+        "ns/event",
+    )
+
+    def check_pressed():
+        return listener.is_shortcut_pressed
+
+    iterations = 10000
+    peak = benchmark_utils.peak_allocation(check_pressed, iterations)
+    benchmark_utils.print_result(
+        "Pressed check, shortcut pressed, peak", peak, "bytes/check"
+    )
+    assert peak == 0, "checking the pressed shortcut allocated memory"
+
+    allocations = benchmark_utils.count_allocations(
+        track_move, iterations, shortcut_listener.__file__
+    )
+    benchmark_utils.print_result(
+        "Stage 2, MouseMove, retained",
+        allocations / iterations,
+        "allocs/event",
+    )
+    # the listener keeps the position of the latest move only,
+    # which is a single block no matter how many moves were made
+    assert allocations <= 1, "MouseMove left allocations behind"
+    # the position and signal arguments of the move, freed again
+    benchmark_utils.print_result(
+        "Stage 2, MouseMove, peak",
+        benchmark_utils.peak_allocation(track_move, iterations),
+        "bytes/event",
+    )
+
+
+def create_bindings(count):
+    """The default Right+Shift binding and count - 1 Right+<letter>
+    bindings, all sharing the right mouse button.
+    """
+    bindings = {shortcut_listener.DEFAULT_BINDING: "Right+Shift"}
+    for index in range(count - 1):
+        bindings[f"binding_{index}"] = buttons_input_to_text(
+            [QtCore.Qt.Key_A + index],
+            QtCore.Qt.MouseButtons(QtCore.Qt.RightButton),
+        )
+    return bindings
+
+
+def benchmark_bindings():
+    """Time pressing, dragging and releasing the default binding
+    with more and more other bindings registered.
+    """
+    move = mouse_event(QtCore.QEvent.MouseMove)
+    for count in (1, 4, 16):
+        listener = shortcut_listener.ShortcutListener()
+        listener.set_bindings(create_bindings(count))
+
+        def press_and_release():
+            press_shortcut(listener)
+            release_shortcut(listener)
+
+        def track_move():
+            listener.drag_tracker.eventFilter(None, move)
+
+        benchmark_utils.print_result(
+            f"{count} bindings, press and release",
+            benchmark_utils.time_per_call(press_and_release, 10000) / 4,
+            "ns/event",
+        )
+        press_shortcut(listener)
+        benchmark_utils.print_result(
+            f"{count} bindings, MouseMove",
+            benchmark_utils.time_per_call(track_move),
+            "ns/event",
+        )
+        release_shortcut(listener)
+
+    # pressing Ctrl while dragging with Right+Shift switches to the
+    # fine binding, releasing it switches back
+    listener = shortcut_listener.ShortcutListener("Right+Shift")
+    listener.set_binding("fine", "Right+Ctrl+Shift")
+    press_shortcut(listener)
+    assert listener.active_binding == shortcut_listener.DEFAULT_BINDING
+    listener.eventFilter(
+        None, key_event(QtCore.QEvent.KeyPress, QtCore.Qt.Key_Control)
+    )
+    assert listener.active_binding == "fine"
+    listener.eventFilter(
+        None, key_event(QtCore.QEvent.KeyRelease, QtCore.Qt.Key_Control)
+    )
+    assert listener.active_binding == shortcut_listener.DEFAULT_BINDING
+    release_shortcut(listener)
+
+
+def benchmark_dispatch():
+    """Time sending a MouseMove through the application while
+    the listener is installed, compared to no listener at all.
+    """
+    widget = QtWidgets.QWidget()
+    move = mouse_event(QtCore.QEvent.MouseMove)
+
+    def send_move():
+        QtWidgets.QApplication.sendEvent(widget, move)
+
+    baseline = benchmark_utils.time_per_call(send_move)
+    benchmark_utils.print_result("Dispatch, no listener", baseline, "ns/event")
+
+    listener = shortcut_listener.ShortcutListener("Right+Shift")
+    listener.install(app)
+    benchmark_utils.print_result(
+        "Dispatch overhead, idle (stage 1)",
+        benchmark_utils.time_per_call(send_move) - baseline,
+        "ns/event",
+    )
+
+    press_shortcut(listener)
+    benchmark_utils.print_result(
+        "Dispatch overhead, armed (stage 1 + 2)",
+        benchmark_utils.time_per_call(send_move) - baseline,
+        "ns/event",
+    )
+
+    release_shortcut(listener)
+    listener.uninstall()
+
+
+if __name__ == "__main__":
+    benchmark_filters()
+    benchmark_bindings()
+    benchmark_dispatch()
@@ -1,5 +1,12 @@
+import math
+import time
+
+from krita import Krita
+
 from PyQt5 import QtWidgets, QtGui, QtCore
 
+from .outline_cache import OutlineCache
+
 # color definitons
 LIGHT_GRAY = QtCore.Qt.GlobalColor.lightGray
 BLACK = QtCore.Qt.GlobalColor.black
@@ -11,6 +18,124 @@ DOT_LINE = QtCore.Qt.PenStyle.DotLine
 HIGH_QUAL_ANTI_ALIAS = QtGui.QPainter.HighQualityAntialiasing
 TRANSLUCENT_WINDOW = QtCore.Qt.WA_TranslucentBackground
 
+# color, width and style of the outline pen
+OUTLINE_STYLE = (BLACK, 1, SOLID_LINE)
+
+# pixels around the outline that its antialiased pen may touch
+OUTLINE_MARGIN = 2
+
+# the side of the square inside a circle, for a diameter of one
+INSCRIBED_SQUARE = math.sqrt(0.5)
+
+# In window mode, the widget is moved and resized to the outline on
+# every update. In overlay mode, it keeps the size of the biggest
+# outline for the whole drag and only repaints the changed ring.
+# Canvas mode works like overlay mode, inside the canvas widget.
+ICON_OVERLAY = "overlay"
+ICON_CANVAS = "canvas"
+ICON_WINDOW = "window"
+ICON_MODES = (ICON_OVERLAY, ICON_CANVAS, ICON_WINDOW)
+
+# While the radius keeps changing, outlines that are not cached are
+# drawn without antialiasing once a high quality paint takes longer
+# than this many nanoseconds, an eighth of a frame at 60Hz
+PAINT_TIME_BUDGET = 2000000
+
+# how much the latest high quality paint counts in the paint time
+PAINT_TIME_WEIGHT = 0.25
+
+# milliseconds without a new radius after which the outline is
+# painted in high quality again
+QUALITY_PAUSE_INTERVAL = 100
+
+# Qt measures arcs in sixteenths of a degree
+FULL_CIRCLE = 360 * 16
+
+# For finding the canvas widget of the active view within krita
+KRITA_CANVAS_CLASSES = ("KisOpenGLCanvas2", "KisQPainterCanvas")
+
+
+def get_visible_arcs(outline, bounds):
+    """Get the arcs of the circle within the outline rectangle that are
+    inside the bounds rectangle, so huge circles that are mostly off
+    screen only draw what can be seen.
+
+    :type outline: QtCore.QRect
+    :type bounds: QtCore.QRect
+    :return: the start and span of each arc for QPainter.drawArc
+    :rtype: list[tuple[int, int]]
+    """
+    centre_x = outline.x() + outline.width() / 2
+    centre_y = outline.y() + outline.height() / 2
+    radius = outline.width() / 2
+    left = bounds.x()
+    top = bounds.y()
+    right = left + bounds.width()
+    bottom = top + bounds.height()
+
+    # the angles where the circle crosses the edges of the bounds,
+    # counter clockwise from the right like Qt's arcs
+    angles = [0.0, 2 * math.pi]
+    for edge in (left, right):
+        distance = edge - centre_x
+        if abs(distance) < radius:
+            angle = math.acos(distance / radius)
+            angles.extend([angle, 2 * math.pi - angle])
+    for edge in (top, bottom):
+        distance = centre_y - edge
+        if abs(distance) < radius:
+            angle = math.asin(distance / radius)
+            angles.extend([angle % (2 * math.pi), math.pi - angle])
+    angles.sort()
+
+    arcs = []
+    for start, end in zip(angles, angles[1:]):
+        middle = (start + end) / 2
+        x = centre_x + math.cos(middle) * radius
+        y = centre_y - math.sin(middle) * radius
+        if not (left <= x <= right and top <= y <= bottom):
+            continue
+        start = int(math.degrees(start) * 16)
+        # round the span up, so neighbouring arcs leave no gap
+        span = int(math.ceil(math.degrees(end) * 16)) - start
+        # crossings on the same angle, like an edge crossing at 0
+        if span <= 0:
+            continue
+        if arcs and arcs[-1][0] + arcs[-1][1] >= start:
+            arcs[-1] = (arcs[-1][0], start + span - arcs[-1][0])
+        else:
+            arcs.append((start, span))
+    return arcs
+
+
+def get_screen_geometry(position):
+    """Get the geometry of the screen at given global position."""
+    screen = QtGui.QGuiApplication.screenAt(position)
+    if screen is None:
+        screen = QtGui.QGuiApplication.primaryScreen()
+    if screen is None:
+        return None
+    return screen.geometry()
+
+
+def find_canvas_widget():
+    """Search the active window for the canvas widget of the view
+    that is shown in its current sub window.
+    """
+    window = Krita.instance().activeWindow()
+    if window is None:
+        return None
+    mdi_area = window.qwindow().findChild(QtWidgets.QMdiArea)
+    if mdi_area is None:
+        return None
+    sub_window = mdi_area.currentSubWindow()
+    if sub_window is None:
+        return None
+    for widget in sub_window.findChildren(QtWidgets.QWidget):
+        if widget.metaObject().className() in KRITA_CANVAS_CLASSES:
+            return widget
+    return None
+
 
 class CustomBrushIcon(QtWidgets.QWidget):
     """A Widget that imitates the brush scaling icon of krita."""
@@ -19,31 +144,235 @@ class CustomBrushIcon(QtWidgets.QWidget):
         super(CustomBrushIcon, self).__init__(parent=parent)
 
         # hide the window frame and make the widget transparent
-        self.setWindowFlags(
+        self.window_flags = (
             self.windowFlags()
             | QtCore.Qt.Window
             | QtCore.Qt.FramelessWindowHint
         )
+        self.setWindowFlags(self.window_flags)
         self.setAttribute(TRANSLUCENT_WINDOW)
+        # inside the canvas, the canvas still gets the mouse events
+        self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
         self.setStyleSheet("background: transparent;")
         self.setWindowTitle("icon")
 
         self._radius = 50
         self.can_paint_icon = True
 
+        # a drag keeps revisiting the same radii, so their outlines are
+        # only rendered once and every repaint is a single blit
+        self.outline_style = OUTLINE_STYLE
+        self.outline_cache = OutlineCache(self.render_outline)
+
+        self.mode = ICON_WINDOW
+        # the global centre of the outline while a drag is shown as
+        # an overlay, and the centre within the widget
+        self.overlay_centre = None
+        self.local_centre = None
+        self.overlay_max_radius = 0
+        self.painted_radius = None
+
+        # with adaptive quality, the time that high quality paints take
+        # decides whether fast paints are used while the radius changes
+        self.adaptive_quality = False
+        self.paint_time_budget = PAINT_TIME_BUDGET
+        self.paint_time = 0
+        self.high_quality = True
+        self.high_quality_paints = 0
+        self.fast_paints = 0
+        self.quality_timer = QtCore.QTimer(self)
+        self.quality_timer.setSingleShot(True)
+        self.quality_timer.setInterval(QUALITY_PAUSE_INTERVAL)
+        self.quality_timer.timeout.connect(self.restore_quality)
+
     def paintEvent(self, _):
         """Draw the icon."""
-        if not self.can_paint_icon:
+        radius = self.radius
+        if not self.can_paint_icon or radius <= 0:
+            return
+        outline = QtCore.QRect(
+            self.get_outline_offset(radius), QtCore.QSize(radius, radius)
+        )
+        # in overlay mode, the painter is clipped to the changed ring
+        painter = QtGui.QPainter(self)
+        if self.high_quality:
+            start = time.perf_counter_ns()
+            self.paint_outline(painter, outline)
+            self.measure_paint_time(time.perf_counter_ns() - start)
+        else:
+            self.paint_fast_outline(painter, outline)
+        painter.end()
+
+    def paint_outline(self, painter, outline):
+        """Paint the outline in high quality."""
+        self.high_quality_paints += 1
+        if self.rect().contains(outline):
+            pixmap = self.outline_cache.get(
+                outline.width(), self.devicePixelRatioF(), self.outline_style
+            )
+            painter.drawPixmap(outline.topLeft(), pixmap)
+        else:
+            # the widget stops at the edge of the screen, so only
+            # part of the outline can be seen
+            self.render_visible_arcs(painter, outline)
+
+    def paint_fast_outline(self, painter, outline):
+        """Paint the cached outline, or draw it without antialiasing."""
+        self.fast_paints += 1
+        if self.rect().contains(outline):
+            pixmap = self.outline_cache.find(
+                outline.width(), self.devicePixelRatioF(), self.outline_style
+            )
+            if pixmap is not None:
+                painter.drawPixmap(outline.topLeft(), pixmap)
+                return
+        self.render_visible_arcs(painter, outline, antialias=False)
+
+    def measure_paint_time(self, paint_time):
+        """Add the nanoseconds of a high quality paint to the paint time."""
+        self.paint_time += PAINT_TIME_WEIGHT * (paint_time - self.paint_time)
+
+    def restore_quality(self):
+        """Paint the whole outline in high quality again."""
+        if self.high_quality:
             return
-        self.painter = QtGui.QPainter(self)
-        self.painter.setRenderHints(HIGH_QUAL_ANTI_ALIAS)
-        self.draw_circle(self.painter)
-        self.painter.end()
+        self.high_quality = True
+        self.update()
 
     def draw_circle(self, painter):
         """Draw a circle with the current radius."""
-        painter.setPen(QtGui.QPen(BLACK, 1, SOLID_LINE))
-        painter.drawEllipse(0, 0, self.radius, self.radius)
+        self.render_outline(painter, self.radius)
+
+    def render_outline(self, painter, radius):
+        """Draw a circle with given radius, see OutlineCache."""
+        painter.setRenderHints(HIGH_QUAL_ANTI_ALIAS)
+        painter.setPen(QtGui.QPen(*self.outline_style))
+        painter.drawEllipse(0, 0, radius, radius)
+
+    def render_visible_arcs(self, painter, outline, antialias=True):
+        """Draw the arcs of the outline that are within the widget."""
+        margin = OUTLINE_MARGIN
+        bounds = self.rect().adjusted(-margin, -margin, margin, margin)
+        if antialias:
+            painter.setRenderHints(HIGH_QUAL_ANTI_ALIAS)
+        painter.setPen(QtGui.QPen(*self.outline_style))
+        for start, span in get_visible_arcs(outline, bounds):
+            painter.drawArc(outline, start, span)
+
+    def get_outline_offset(self, radius):
+        """Get where the outline of given radius starts in the widget."""
+        if self.local_centre is None:
+            return QtCore.QPoint(0, 0)
+        return QtCore.QPoint(
+            int(self.local_centre.x() - radius / 2),
+            int(self.local_centre.y() - radius / 2),
+        )
+
+    def get_ring_rects(self, radius, other_radius):
+        """Get rectangles covering the ring between the outlines of given
+        radii: the box around the bigger outline, without the square
+        inside the smaller one. Ellipse regions would save a few more
+        pixels, but take longer to build than those pixels take to paint.
+
+        :rtype: list[tuple[int, int, int, int]]
+        """
+        margin = OUTLINE_MARGIN
+        low, high = sorted([radius, other_radius])
+        offset = self.get_outline_offset(high)
+        left = offset.x() - margin
+        top = offset.y() - margin
+        size = high + 2 * margin
+
+        side = int((low - 2 * margin) * INSCRIBED_SQUARE)
+        if side <= 0:
+            return [(left, top, size, size)]
+
+        # the square is centred on the outline, like the box
+        inner_left = left + (size - side) // 2
+        inner_top = top + (size - side) // 2
+        inner_bottom = inner_top + side
+        return [
+            (left, top, size, inner_top - top),
+            (left, inner_bottom, size, top + size - inner_bottom),
+            (left, inner_top, inner_left - left, side),
+            (
+                inner_left + side,
+                inner_top,
+                left + size - inner_left - side,
+                side,
+            ),
+        ]
+
+    def begin_drag(self, position, max_radius):
+        """Size the overlay once for a drag around given position, big
+        enough for max_radius but not past the screen, or the canvas in
+        canvas mode. Does nothing in window mode.
+
+        :param position: the global centre of the outline
+        :type position: QtCore.QPoint
+        :param max_radius: the biggest radius of the drag
+        :type max_radius: int or float
+        """
+        # without a canvas, the overlay is a window of its own
+        canvas = None
+        if self.mode == ICON_CANVAS:
+            canvas = find_canvas_widget()
+        self.set_canvas(canvas)
+        if self.mode == ICON_WINDOW:
+            return
+
+        if canvas is None:
+            centre = QtCore.QPoint(position)
+            bounds = get_screen_geometry(position)
+        else:
+            centre = canvas.mapFromGlobal(position)
+            bounds = canvas.rect()
+
+        size = int(max_radius) + 2 * OUTLINE_MARGIN
+        geometry = QtCore.QRect(0, 0, size, size)
+        geometry.moveCenter(centre)
+        if bounds is not None:
+            geometry = geometry.intersected(bounds)
+
+        self.overlay_centre = QtCore.QPoint(position)
+        self.local_centre = centre - geometry.topLeft()
+        self.overlay_max_radius = max_radius
+        self.painted_radius = None
+        self.setGeometry(geometry)
+
+    def end_drag(self):
+        """Stop showing the drag as an overlay."""
+        self.quality_timer.stop()
+        self.high_quality = True
+        self.overlay_centre = None
+        self.local_centre = None
+        self.painted_radius = None
+        # the canvas may be closed before the next drag
+        self.set_canvas(None)
+
+    def set_canvas(self, canvas):
+        """Draw the icon inside given canvas widget, so it is part of
+        krita's own paint pass, or in a window of its own when None.
+
+        :type canvas: QtWidgets.QWidget
+        """
+        if canvas is not self.parentWidget():
+            self.setParent(canvas)
+            if canvas is None:
+                self.setWindowFlags(self.window_flags)
+        if canvas is not None:
+            self.raise_()
+
+    def update_ring(self):
+        """Repaint only the ring between the painted and current outline."""
+        radius = self.radius
+        painted_radius = self.painted_radius
+        self.painted_radius = radius
+        if painted_radius is None:
+            self.update()
+        elif painted_radius != radius:
+            for rect in self.get_ring_rects(painted_radius, radius):
+                self.update(*rect)
 
     def move_to(self, position):
         """Move the widget to given position."""
@@ -56,11 +385,29 @@ class CustomBrushIcon(QtWidgets.QWidget):
 
     def show_at(self, position):
         """Show the widget at given position."""
-        self.move(
+        if self.overlay_centre is not None:
+            # the drag was anchored somewhere else
+            if position != self.overlay_centre:
+                self.begin_drag(position, self.overlay_max_radius)
+            self.update_ring()
+            self.show()
+            return
+
+        # huge outlines are cut off at the edges of the screen
+        geometry = QtCore.QRect(
             int(position.x() - self.radius / 2),
             int(position.y() - self.radius / 2),
+            self.radius,
+            self.radius,
         )
-        self.resize(self.radius, self.radius)
+        screen_geometry = get_screen_geometry(position)
+        if screen_geometry is not None:
+            geometry = geometry.intersected(screen_geometry)
+        if geometry.isEmpty():
+            self.hide()
+            return
+        self.local_centre = position - geometry.topLeft()
+        self.setGeometry(geometry)
         self.show()
 
     @property
@@ -71,4 +418,8 @@ class CustomBrushIcon(QtWidgets.QWidget):
     @radius.setter
     def radius(self, value):
         """Set radius to given value."""
+        if self.adaptive_quality and int(value) != self.radius:
+            # the radius is changing, paint fast if painting is slow
+            self.high_quality = self.paint_time <= self.paint_time_budget
+            self.quality_timer.start()
         self._radius = value
@@ -3,21 +3,47 @@ import os
 from krita import DockWidget
 
 from PyQt5 import QtWidgets, QtCore
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import pyqtSignal
 
+from .config import ShortcutType, keys_to_text
 from .widgets import kis_input_button, kis_slider_spinbox
-from .config import buttons_input_to_text
+from ..settings import (
+    SettingsStore,
+    DEFAULT_SHORTCUT,
+    DEFAULT_MAX_SIZE,
+    DEFAULT_MAX_BRUSH_SIZE,
+    DEFAULT_MIN_BRUSH_SIZE,
+    DEFAULT_COALESCE_INTERVAL,
+    DEFAULT_MIN_SIZE_CHANGE,
+    DEFAULT_PREVIEW_ONLY,
+    DEFAULT_CATCH_UP_INTERVAL,
+    DEFAULT_RESPONSE_CURVE,
+    DEFAULT_CURVE_STRENGTH,
+    DEFAULT_CURVE_POINTS,
+    DEFAULT_DRAG_MODE,
+    DEFAULT_DRAG_ANGLE,
+    DEFAULT_SLIDE_RANGE,
+    DEFAULT_SMOOTHING,
+    DEFAULT_SMOOTHING_CUTOFF,
+    DEFAULT_SMOOTHING_SPEED_FACTOR,
+    DEFAULT_PREDICTION,
+    DEFAULT_ICON_MODE,
+    DEFAULT_ADAPTIVE_QUALITY,
+    DEFAULT_PIPELINE_STAGES,
+    DEFAULT_PROFILE_PIPELINE,
+    DEFAULT_FINE_FACTOR,
+    DEFAULT_FINE_MODIFIER,
+    SUGGESTED_PARAMETER_SHORTCUTS,
+)
+from .c_brush_icon import ICON_MODES
+from ..drivers.drag_geometry import DRAG_MODES
+from ..drivers.response_curve import RESPONSE_CURVES
 from ..utils import write_to_json, get_settings_file, read_from_json
 
 
 DOCK_OBJECT_NAME = "c_resize_brush_dock"
 SETTINGS_FILE = get_settings_file(DOCK_OBJECT_NAME)
 
-DEFAULT_SHORTCUT = buttons_input_to_text(
-    [Qt.Key_Shift],
-    Qt.MouseButtons(Qt.RightButton),
-)
-
 
 class DockSignalHandler(QtCore.QObject):
     shortcut_changed = pyqtSignal(str)
@@ -25,6 +51,7 @@ class DockSignalHandler(QtCore.QObject):
 
 
 SINGAL_HANDLER = DockSignalHandler()
+SETTINGS_STORE = SettingsStore(read_from_json(SETTINGS_FILE))
 
 
 class CustomBrushResizeDock(DockWidget):
@@ -42,37 +69,198 @@ class CustomBrushResizeDock(DockWidget):
         min_brush_size = kis_slider_spinbox.KisSliderSpinBox()
         max_size = kis_slider_spinbox.KisSliderSpinBox()
         shortcut_button = kis_input_button.KisInputButton()
+        coalesce_interval = kis_slider_spinbox.KisSliderSpinBox()
+        min_size_change = kis_slider_spinbox.KisSliderSpinBox()
+        preview_only = QtWidgets.QCheckBox()
+        catch_up_interval = kis_slider_spinbox.KisSliderSpinBox()
+        response_curve = QtWidgets.QComboBox()
+        curve_strength = kis_slider_spinbox.KisSliderSpinBox()
+        drag_mode = QtWidgets.QComboBox()
+        drag_angle = kis_slider_spinbox.KisSliderSpinBox()
+        slide_range = QtWidgets.QCheckBox()
+        smoothing = QtWidgets.QCheckBox()
+        smoothing_cutoff = kis_slider_spinbox.KisSliderSpinBox()
+        smoothing_speed_factor = kis_slider_spinbox.KisSliderSpinBox()
+        prediction = kis_slider_spinbox.KisSliderSpinBox()
+        icon_mode = QtWidgets.QComboBox()
+        adaptive_quality = QtWidgets.QCheckBox()
+        fine_shortcut = kis_input_button.KisInputButton()
+        fine_factor = kis_slider_spinbox.KisSliderSpinBox()
+        fine_modifier = kis_input_button.KisInputButton(
+            ShortcutType.KeyCombinationType
+        )
+        opacity_shortcut = kis_input_button.KisInputButton()
+        flow_shortcut = kis_input_button.KisInputButton()
+        rotation_shortcut = kis_input_button.KisInputButton()
+
+        # the other brush parameters only get a binding when checked
+        self.shortcut_toggles = {
+            "fine_shortcut": QtWidgets.QCheckBox(),
+            "opacity_shortcut": QtWidgets.QCheckBox(),
+            "flow_shortcut": QtWidgets.QCheckBox(),
+            "rotation_shortcut": QtWidgets.QCheckBox(),
+        }
 
         layout.addRow(i18n("Maximum Brush Size:"), max_brush_size)
         layout.addRow(i18n("Minimum Brush Size:"), min_brush_size)
         layout.addRow(i18n("Resize Range Max:"), max_size)
         layout.addRow(i18n("Shortcut:"), shortcut_button)
+        layout.addRow(i18n("Coalesce Window (ms):"), coalesce_interval)
+        layout.addRow(i18n("Minimum Size Change:"), min_size_change)
+        layout.addRow(i18n("Preview Only:"), preview_only)
+        layout.addRow(i18n("Preview Catch Up (ms):"), catch_up_interval)
+        layout.addRow(i18n("Response Curve:"), response_curve)
+        layout.addRow(i18n("Curve Strength:"), curve_strength)
+        layout.addRow(i18n("Drag Direction:"), drag_mode)
+        layout.addRow(i18n("Drag Angle:"), drag_angle)
+        layout.addRow(i18n("Slide Range At Limits:"), slide_range)
+        layout.addRow(i18n("Smoothing:"), smoothing)
+        layout.addRow(i18n("Smoothing Cutoff (Hz):"), smoothing_cutoff)
+        layout.addRow(i18n("Smoothing Speed Factor:"), smoothing_speed_factor)
+        layout.addRow(i18n("Prediction (ms):"), prediction)
+        layout.addRow(i18n("Preview Mode:"), icon_mode)
+        layout.addRow(i18n("Adaptive Preview Quality:"), adaptive_quality)
+        layout.addRow(
+            i18n("Fine Shortcut:"),
+            self.create_shortcut_row("fine_shortcut", fine_shortcut),
+        )
+        layout.addRow(i18n("Fine Factor:"), fine_factor)
+        layout.addRow(i18n("Fine Modifier:"), fine_modifier)
+        layout.addRow(
+            i18n("Opacity Shortcut:"),
+            self.create_shortcut_row("opacity_shortcut", opacity_shortcut),
+        )
+        layout.addRow(
+            i18n("Flow Shortcut:"),
+            self.create_shortcut_row("flow_shortcut", flow_shortcut),
+        )
+        layout.addRow(
+            i18n("Rotation Shortcut:"),
+            self.create_shortcut_row("rotation_shortcut", rotation_shortcut),
+        )
 
         self.handler = SINGAL_HANDLER
+        self.settings_store = SETTINGS_STORE
         self.widgets = {
             "max_brush_size": max_brush_size,
             "min_brush_size": min_brush_size,
             "max_size": max_size,
             "shortcut": shortcut_button,
+            "coalesce_interval": coalesce_interval,
+            "min_size_change": min_size_change,
+            "preview_only": preview_only,
+            "catch_up_interval": catch_up_interval,
+            "response_curve": response_curve,
+            "curve_strength": curve_strength,
+            "drag_mode": drag_mode,
+            "drag_angle": drag_angle,
+            "slide_range": slide_range,
+            "smoothing": smoothing,
+            "smoothing_cutoff": smoothing_cutoff,
+            "smoothing_speed_factor": smoothing_speed_factor,
+            "prediction": prediction,
+            "icon_mode": icon_mode,
+            "adaptive_quality": adaptive_quality,
+            "fine_shortcut": fine_shortcut,
+            "fine_factor": fine_factor,
+            "fine_modifier": fine_modifier,
+            "opacity_shortcut": opacity_shortcut,
+            "flow_shortcut": flow_shortcut,
+            "rotation_shortcut": rotation_shortcut,
         }
 
+        # the spline points can only be edited in the settings file
+        self.curve_points = DEFAULT_CURVE_POINTS
+
+        # so can the stages of the pipeline, and whether to profile them
+        self.pipeline_stages = DEFAULT_PIPELINE_STAGES
+        self.profile_pipeline = DEFAULT_PROFILE_PIPELINE
+
         self._set_internal_settings()
 
     def _set_internal_settings(self):
         self.widgets["max_size"].set_range(10, 1000, 0)
         self.widgets["max_size"].setSingleStep(1)
-        self.widgets["max_size"].setValue(100)
+        self.widgets["max_size"].setValue(DEFAULT_MAX_SIZE)
 
         self.widgets["max_brush_size"].set_range(10, 10000, 0)
         self.widgets["max_brush_size"].setSingleStep(1)
-        self.widgets["max_brush_size"].setValue(1000)
+        self.widgets["max_brush_size"].setValue(DEFAULT_MAX_BRUSH_SIZE)
 
         self.widgets["min_brush_size"].set_range(0, 1000, 0)
         self.widgets["min_brush_size"].setSingleStep(1)
-        self.widgets["min_brush_size"].setValue(0)
+        self.widgets["min_brush_size"].setValue(DEFAULT_MIN_BRUSH_SIZE)
+
+        # 0 disables coalescing, 16ms is about one frame at 60Hz
+        self.widgets["coalesce_interval"].set_range(0, 100, 0)
+        self.widgets["coalesce_interval"].setSingleStep(1)
+        self.widgets["coalesce_interval"].setValue(DEFAULT_COALESCE_INTERVAL)
+
+        self.widgets["min_size_change"].set_range(1, 100, 0)
+        self.widgets["min_size_change"].setSingleStep(1)
+        self.widgets["min_size_change"].setValue(DEFAULT_MIN_SIZE_CHANGE)
+
+        self.widgets["preview_only"].setChecked(DEFAULT_PREVIEW_ONLY)
+
+        # 0 only applies the size to the view once the drag ends
+        self.widgets["catch_up_interval"].set_range(0, 1000, 0)
+        self.widgets["catch_up_interval"].setSingleStep(10)
+        self.widgets["catch_up_interval"].setValue(DEFAULT_CATCH_UP_INTERVAL)
+
+        for curve in RESPONSE_CURVES:
+            self.widgets["response_curve"].addItem(i18n(curve.title()), curve)
+        self.set_response_curve(DEFAULT_RESPONSE_CURVE)
+
+        self.widgets["curve_strength"].set_range(0.1, 10, 1)
+        self.widgets["curve_strength"].setSingleStep(0.1)
+        self.widgets["curve_strength"].setValue(DEFAULT_CURVE_STRENGTH)
+
+        for mode in DRAG_MODES:
+            self.widgets["drag_mode"].addItem(i18n(mode.title()), mode)
+        self.set_drag_mode(DEFAULT_DRAG_MODE)
+
+        # only used when dragging along an axis
+        self.widgets["drag_angle"].set_range(-180, 180, 0)
+        self.widgets["drag_angle"].setSingleStep(1)
+        self.widgets["drag_angle"].setValue(DEFAULT_DRAG_ANGLE)
+
+        self.widgets["slide_range"].setChecked(DEFAULT_SLIDE_RANGE)
+
+        self.widgets["smoothing"].setChecked(DEFAULT_SMOOTHING)
+
+        self.widgets["smoothing_cutoff"].set_range(0.1, 10, 1)
+        self.widgets["smoothing_cutoff"].setSingleStep(0.1)
+        self.widgets["smoothing_cutoff"].setValue(DEFAULT_SMOOTHING_CUTOFF)
+
+        # how much faster the cutoff gets per pixel per second
+        self.widgets["smoothing_speed_factor"].set_range(0, 0.1, 3)
+        self.widgets["smoothing_speed_factor"].setSingleStep(0.001)
+        self.widgets["smoothing_speed_factor"].setValue(
+            DEFAULT_SMOOTHING_SPEED_FACTOR
+        )
+
+        # a frame at 60Hz is about 16ms
+        self.widgets["prediction"].set_range(0, 50, 0)
+        self.widgets["prediction"].setSingleStep(1)
+        self.widgets["prediction"].setValue(DEFAULT_PREDICTION)
+
+        for mode in ICON_MODES:
+            self.widgets["icon_mode"].addItem(i18n(mode.title()), mode)
+        self.set_icon_mode(DEFAULT_ICON_MODE)
+        self.widgets["adaptive_quality"].setChecked(DEFAULT_ADAPTIVE_QUALITY)
+
+        self.widgets["fine_factor"].set_range(1, 20, 1)
+        self.widgets["fine_factor"].setSingleStep(0.5)
+        self.widgets["fine_factor"].setValue(DEFAULT_FINE_FACTOR)
+        self.set_fine_modifier(DEFAULT_FINE_MODIFIER)
+
+        for name, shortcut in SUGGESTED_PARAMETER_SHORTCUTS.items():
+            self.widgets[name].setText(shortcut)
+            self.shortcut_toggles[name].setChecked(False)
 
         self.widgets["shortcut"].setText(DEFAULT_SHORTCUT)
         self.import_settings()
+        self.update_settings_store()
 
         self.widgets["shortcut"].dataChanged.connect(
             self.emit_shortcut_changed
@@ -80,6 +268,7 @@ class CustomBrushResizeDock(DockWidget):
 
         # handling tool settings
         self.handler.settings_changed.connect(self.export_settings)
+        self.handler.settings_changed.connect(self.update_settings_store)
         self.widgets["max_size"].valueChanged.connect(
             self.handler.settings_changed.emit
         )
@@ -92,6 +281,62 @@ class CustomBrushResizeDock(DockWidget):
         self.widgets["shortcut"].dataChanged.connect(
             self.handler.settings_changed.emit
         )
+        self.widgets["coalesce_interval"].valueChanged.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["min_size_change"].valueChanged.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["preview_only"].toggled.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["catch_up_interval"].valueChanged.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["response_curve"].currentIndexChanged.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["curve_strength"].valueChanged.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["drag_mode"].currentIndexChanged.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["drag_angle"].valueChanged.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["slide_range"].toggled.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["smoothing"].toggled.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["smoothing_cutoff"].valueChanged.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["smoothing_speed_factor"].valueChanged.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["prediction"].valueChanged.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["icon_mode"].currentIndexChanged.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["adaptive_quality"].toggled.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["fine_factor"].valueChanged.connect(
+            self.handler.settings_changed.emit
+        )
+        self.widgets["fine_modifier"].dataChanged.connect(
+            self.handler.settings_changed.emit
+        )
+        for name, toggle in self.shortcut_toggles.items():
+            self.widgets[name].dataChanged.connect(
+                self.handler.settings_changed.emit
+            )
+            toggle.toggled.connect(self.handler.settings_changed.emit)
 
     def as_dict(self):
         return {
@@ -99,11 +344,102 @@ class CustomBrushResizeDock(DockWidget):
             "max_brush_size": self.widgets["max_brush_size"].value(),
             "min_brush_size": self.widgets["min_brush_size"].value(),
             "shortcut": self.widgets["shortcut"].text(),
+            "coalesce_interval": int(
+                self.widgets["coalesce_interval"].value()
+            ),
+            "min_size_change": int(self.widgets["min_size_change"].value()),
+            "preview_only": self.widgets["preview_only"].isChecked(),
+            "catch_up_interval": int(
+                self.widgets["catch_up_interval"].value()
+            ),
+            "response_curve": self.widgets["response_curve"].currentData(),
+            "curve_strength": self.widgets["curve_strength"].value(),
+            "curve_points": self.curve_points,
+            "drag_mode": self.widgets["drag_mode"].currentData(),
+            "drag_angle": int(self.widgets["drag_angle"].value()),
+            "slide_range": self.widgets["slide_range"].isChecked(),
+            "smoothing": self.widgets["smoothing"].isChecked(),
+            "smoothing_cutoff": self.widgets["smoothing_cutoff"].value(),
+            "smoothing_speed_factor": self.widgets[
+                "smoothing_speed_factor"
+            ].value(),
+            "prediction": int(self.widgets["prediction"].value()),
+            "icon_mode": self.widgets["icon_mode"].currentData(),
+            "adaptive_quality": self.widgets["adaptive_quality"].isChecked(),
+            "pipeline_stages": self.pipeline_stages,
+            "profile_pipeline": self.profile_pipeline,
+            "fine_shortcut": self.get_parameter_shortcut("fine_shortcut"),
+            "fine_factor": self.widgets["fine_factor"].value(),
+            "fine_modifier": self.get_fine_modifier(),
+            "opacity_shortcut": self.get_parameter_shortcut(
+                "opacity_shortcut"
+            ),
+            "flow_shortcut": self.get_parameter_shortcut("flow_shortcut"),
+            "rotation_shortcut": self.get_parameter_shortcut(
+                "rotation_shortcut"
+            ),
         }
 
+    def create_shortcut_row(self, name, shortcut_button):
+        """Put the shortcut button next to the check box that enables it."""
+        row = QtWidgets.QWidget()
+        row_layout = QtWidgets.QHBoxLayout(row)
+        row_layout.setContentsMargins(0, 0, 0, 0)
+        row_layout.addWidget(self.shortcut_toggles[name])
+        row_layout.addWidget(shortcut_button, 1)
+        return row
+
+    def get_fine_modifier(self):
+        """Get the keys of the fine modifier, empty when none are set."""
+        text = self.widgets["fine_modifier"].text()
+        if text in (
+            kis_input_button.INPUT_TEXT,
+            kis_input_button.ERROR_TEXT,
+            keys_to_text([]),
+        ):
+            return ""
+        return text
+
+    def set_fine_modifier(self, modifier):
+        """Set the keys of the fine modifier, empty to disable it."""
+        self.widgets["fine_modifier"].setText(modifier or keys_to_text([]))
+
+    def get_parameter_shortcut(self, name):
+        """Get the shortcut of a brush parameter, empty when disabled."""
+        if not self.shortcut_toggles[name].isChecked():
+            return ""
+        return self.widgets[name].text()
+
+    def set_parameter_shortcut(self, name, shortcut):
+        """Enable the brush parameter if given shortcut is set."""
+        if shortcut:
+            self.widgets[name].setText(shortcut)
+        self.shortcut_toggles[name].setChecked(bool(shortcut))
+
+    def set_response_curve(self, curve):
+        """Select given curve, unknown curves are ignored."""
+        index = self.widgets["response_curve"].findData(curve)
+        if index != -1:
+            self.widgets["response_curve"].setCurrentIndex(index)
+
+    def set_drag_mode(self, mode):
+        """Select given drag mode, unknown modes are ignored."""
+        index = self.widgets["drag_mode"].findData(mode)
+        if index != -1:
+            self.widgets["drag_mode"].setCurrentIndex(index)
+
+    def set_icon_mode(self, mode):
+        """Select given icon mode, unknown modes are ignored."""
+        index = self.widgets["icon_mode"].findData(mode)
+        if index != -1:
+            self.widgets["icon_mode"].setCurrentIndex(index)
+
     def emit_shortcut_changed(self):
         self.handler.shortcut_changed.emit(self.widgets["shortcut"].text())
 
+    def update_settings_store(self):
+        self.settings_store.update(self.as_dict())
+
     def canvasChanged(self, _):
         pass
 
@@ -130,3 +466,77 @@ class CustomBrushResizeDock(DockWidget):
         self.widgets["shortcut"].setText(
             settings.get("shortcut", self.widgets["shortcut"].text())
         )
+        self.widgets["coalesce_interval"].setValue(
+            settings.get(
+                "coalesce_interval", self.widgets["coalesce_interval"].value()
+            )
+        )
+        self.widgets["min_size_change"].setValue(
+            settings.get(
+                "min_size_change", self.widgets["min_size_change"].value()
+            )
+        )
+        self.widgets["preview_only"].setChecked(
+            settings.get(
+                "preview_only", self.widgets["preview_only"].isChecked()
+            )
+        )
+        self.widgets["catch_up_interval"].setValue(
+            settings.get(
+                "catch_up_interval", self.widgets["catch_up_interval"].value()
+            )
+        )
+        self.set_response_curve(settings.get("response_curve"))
+        self.widgets["curve_strength"].setValue(
+            settings.get(
+                "curve_strength", self.widgets["curve_strength"].value()
+            )
+        )
+        self.curve_points = settings.get("curve_points", self.curve_points)
+        self.set_drag_mode(settings.get("drag_mode"))
+        self.widgets["slide_range"].setChecked(
+            settings.get(
+                "slide_range", self.widgets["slide_range"].isChecked()
+            )
+        )
+        self.widgets["smoothing"].setChecked(
+            settings.get("smoothing", self.widgets["smoothing"].isChecked())
+        )
+        self.widgets["smoothing_cutoff"].setValue(
+            settings.get(
+                "smoothing_cutoff", self.widgets["smoothing_cutoff"].value()
+            )
+        )
+        self.widgets["smoothing_speed_factor"].setValue(
+            settings.get(
+                "smoothing_speed_factor",
+                self.widgets["smoothing_speed_factor"].value(),
+            )
+        )
+        self.widgets["prediction"].setValue(
+            settings.get("prediction", self.widgets["prediction"].value())
+        )
+        self.set_icon_mode(settings.get("icon_mode"))
+        self.widgets["adaptive_quality"].setChecked(
+            settings.get(
+                "adaptive_quality",
+                self.widgets["adaptive_quality"].isChecked(),
+            )
+        )
+        self.pipeline_stages = settings.get(
+            "pipeline_stages", self.pipeline_stages
+        )
+        self.profile_pipeline = settings.get(
+            "profile_pipeline", self.profile_pipeline
+        )
+        self.widgets["fine_factor"].setValue(
+            settings.get("fine_factor", self.widgets["fine_factor"].value())
+        )
+        self.set_fine_modifier(
+            settings.get("fine_modifier", self.get_fine_modifier())
+        )
+        for name in SUGGESTED_PARAMETER_SHORTCUTS:
+            self.set_parameter_shortcut(name, settings.get(name))
+        self.widgets["drag_angle"].setValue(
+            settings.get("drag_angle", self.widgets["drag_angle"].value())
+        )
@@ -0,0 +1,105 @@
+import collections
+import math
+
+from PyQt5 import QtGui, QtCore
+
+
+# Pixels that the cached outlines may use together, about 32MB
+DEFAULT_PIXEL_BUDGET = 8 * 1024 * 1024
+
+
+class OutlineCache(object):
+    """A least recently used cache of pre-rendered brush outlines.
+    Outlines are keyed by their radius, device pixel ratio and style,
+    and the least recently used ones are dropped once all of them
+    together use more pixels than the budget.
+    """
+
+    __slots__ = (
+        "render",
+        "pixel_budget",
+        "pixels",
+        "pixmaps",
+        "hits",
+        "misses",
+    )
+
+    def __init__(self, render, pixel_budget=DEFAULT_PIXEL_BUDGET):
+        """
+        :param render: draws the outline of a radius with a painter,
+            called as render(painter, radius)
+        :type render: callable
+        :param pixel_budget: pixels the cached outlines may use together
+        :type pixel_budget: int
+        """
+        self.render = render
+        self.pixel_budget = pixel_budget
+        self.pixels = 0
+        self.pixmaps = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, radius, device_pixel_ratio, style):
+        """Get the outline pixmap of given radius, rendering it if needed.
+
+        :type radius: int
+        :type device_pixel_ratio: float
+        :param style: anything hashable that changes how render draws
+        :rtype: QtGui.QPixmap
+        """
+        key = (radius, device_pixel_ratio, style)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            self.hits += 1
+            self.pixmaps.move_to_end(key)
+            return pixmap
+
+        self.misses += 1
+        pixmap = self.create_pixmap(radius, device_pixel_ratio)
+        pixels = pixmap.width() * pixmap.height()
+        # outlines bigger than the whole budget are never kept
+        if pixels > self.pixel_budget:
+            return pixmap
+
+        self.pixmaps[key] = pixmap
+        self.pixels += pixels
+        while self.pixels > self.pixel_budget:
+            _, evicted = self.pixmaps.popitem(last=False)
+            self.pixels -= evicted.width() * evicted.height()
+        return pixmap
+
+    def find(self, radius, device_pixel_ratio, style):
+        """Get the outline pixmap of given radius if it is cached,
+        without rendering it otherwise.
+
+        :rtype: QtGui.QPixmap or None
+        """
+        key = (radius, device_pixel_ratio, style)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.pixmaps.move_to_end(key)
+        return pixmap
+
+    def create_pixmap(self, radius, device_pixel_ratio):
+        """Render the outline of given radius on a transparent pixmap."""
+        size = int(math.ceil(radius * device_pixel_ratio))
+        pixmap = QtGui.QPixmap(size, size)
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+        pixmap.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(pixmap)
+        self.render(painter, radius)
+        painter.end()
+        return pixmap
+
+    def clear(self):
+        """Drop every cached outline."""
+        self.pixmaps.clear()
+        self.pixels = 0
+
+    def reset_counters(self):
+        """Reset the amount of hits and misses."""
+        self.hits = 0
+        self.misses = 0
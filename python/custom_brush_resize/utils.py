@@ -77,3 +77,9 @@ def get_settings_file(package_name):
     """Get a json file that is in the Appdata folder."""
     path = f"%APPDATA%/{package_name}/settings/{package_name}.json"
     return os.path.normpath(os.path.expandvars(path))
+
+
+def get_recordings_folder(package_name):
+    """Get the folder in the Appdata folder that recordings are saved to."""
+    path = f"%APPDATA%/{package_name}/recordings"
+    return os.path.normpath(os.path.expandvars(path))